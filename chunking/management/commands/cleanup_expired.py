@@ -1,5 +1,6 @@
 """
-Django management command to delete expired conversations and old dispatch jobs.
+Django management command to delete expired conversations and old dispatch jobs,
+and deactivate expired iOS auth tokens.
 
 Run daily via Heroku Scheduler:
     python manage.py cleanup_expired
@@ -10,12 +11,14 @@ from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
 from chunking.models import ChunkedConversation
-from chunking.s3_handler_hybrid import delete_conversation_audio, get_s3_client
+from chunking.s3_handler_hybrid import delete_conversation_audio
+from streaming_transcriber.clients import get_s3_client
 from history.models import DispatchJob
+from streaming.models import AuthToken
 
 
 class Command(BaseCommand):
-    help = 'Delete conversations that have passed their retention period and old dispatch jobs'
+    help = 'Delete conversations that have passed their retention period and old dispatch jobs, deactivate expired auth tokens'
 
     def handle(self, *args, **options):
         self.stdout.write("🗑️  Starting cleanup...")
@@ -86,4 +89,16 @@ class Command(BaseCommand):
             f"{s3_deleted} S3 documents deleted, {s3_errors} errors"
         ))
 
+        # ===== DEACTIVATE EXPIRED AUTH TOKENS =====
+        self.stdout.write("\n🔑 Deactivating expired auth tokens...")
+
+        # Token checks reject expired tokens without writing, so flip them
+        # here in one UPDATE instead of one per request
+        tokens_deactivated = AuthToken.objects.filter(
+            is_active=True,
+            expires_at__lte=timezone.now()
+        ).update(is_active=False)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Auth tokens cleanup complete: {tokens_deactivated} deactivated"))
+
         self.stdout.write(self.style.SUCCESS("\n✨ All cleanup tasks complete"))
\ No newline at end of file
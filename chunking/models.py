@@ -117,13 +117,13 @@ class ChunkedConversation(models.Model):
         """Schedule this conversation for deletion"""
         if not self.save_permanently:
             self.scheduled_deletion_date = timezone.now() + timedelta(days=days)
-            self.save()
+            self.save(update_fields=['scheduled_deletion_date', 'updated_at'])
 
     def mark_permanent(self):
         """Mark this conversation to never be auto-deleted"""
         self.save_permanently = True
         self.scheduled_deletion_date = None
-        self.save()
+        self.save(update_fields=['save_permanently', 'scheduled_deletion_date', 'updated_at'])
 
     def get_duration_display(self):
         """Human-readable duration"""
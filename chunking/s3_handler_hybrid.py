@@ -3,12 +3,13 @@ Hybrid S3 handler: Individual chunks + Multipart upload via UploadPartCopy.
 Memory-efficient: streams to S3, uses server-side copy for multipart.
 """
 
-import boto3
 from botocore.exceptions import ClientError
 from django.conf import settings
 from django.utils import timezone
 import re
 
+from streaming_transcriber.clients import get_s3_client
+
 
 def sanitize_username_for_s3(username):
     """Sanitize username to be S3-safe."""
@@ -21,16 +22,6 @@ def sanitize_username_for_s3(username):
     return safe_name
 
 
-def get_s3_client():
-    """Get configured S3 client"""
-    return boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME
-    )
-
-
 def start_multipart_upload(conversation_id, username):
     """
     Start multipart upload for complete conversation file.
@@ -226,21 +217,20 @@ def concatenate_and_upload_small_conversation(conversation_id, username, chunk_s
 
         print(f"🔗 Concatenating {len(chunk_s3_urls)} chunks (< 10MB)")
 
-        # Download all chunks and concatenate in memory
-        concatenated_data = b''
+        # Download all chunks and concatenate in memory; a bytearray grows in
+        # place, where bytes += would copy everything received so far per chunk
+        concatenated_data = bytearray()
 
         for idx, chunk_url in enumerate(chunk_s3_urls):
             key = chunk_url.split('.amazonaws.com/')[-1]
 
-            print(f"   Downloading chunk {idx}...")
             response = s3_client.get_object(
                 Bucket=settings.AWS_STORAGE_BUCKET_NAME,
                 Key=key
             )
 
             chunk_data = response['Body'].read()
-            concatenated_data += chunk_data
-            print(f"   ✅ Chunk {idx}: {len(chunk_data):,} bytes")
+            concatenated_data.extend(chunk_data)
 
         print(f"   Total size: {len(concatenated_data):,} bytes")
 
@@ -305,7 +295,6 @@ def build_multipart_from_chunks(conversation_id, username, chunk_s3_urls):
             size = response['ContentLength']
             chunk_info.append({'key': key, 'size': size})
             total_size += size
-            print(f"   Chunk {idx}: {size:,} bytes")
 
         print(f"   Total: {total_size:,} bytes ({total_size / 1024 / 1024:.2f} MB)")
 
@@ -364,13 +353,13 @@ def build_multipart_from_chunks(conversation_id, username, chunk_s3_urls):
                     # This only happens when batching small chunks into one part
                     print(f"      Concatenating {len(current_batch)} chunks for this part...")
 
-                    part_data = b''
+                    part_data = bytearray()
                     for chunk in current_batch:
                         response = s3_client.get_object(
                             Bucket=settings.AWS_STORAGE_BUCKET_NAME,
                             Key=chunk['key']
                         )
-                        part_data += response['Body'].read()
+                        part_data.extend(response['Body'].read())
 
                     # Upload the concatenated part
                     upload_response = s3_client.upload_part(
@@ -0,0 +1,61 @@
+"""
+Background jobs for the chunking app.
+
+These run on the django-q worker dyno instead of in threads on the gunicorn
+web dyno, so a long AssemblyAI transcription no longer holds a web process
+and isn't lost when the web dyno restarts.
+
+They're queued on their own cluster (Procfile `transcriber`, see
+ALT_CLUSTERS in settings) so multi-minute transcriptions can't occupy the
+default cluster's workers and hold up pollA and push notifications.
+"""
+import logging
+
+from .models import ChunkedConversation
+from .transcription import analyze_conversation, transcribe_chunks_preliminary, transcribe_final_audio
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPTION_CLUSTER = 'transcription'
+
+# The cluster-wide Q_CLUSTER timeout (60s) is sized for pollA; AssemblyAI's
+# blocking transcribe() plus speaker ID and analysis take minutes on long
+# recordings, so these tasks are queued with their own timeouts.
+FINAL_TRANSCRIPTION_TIMEOUT = 30 * 60
+PRELIMINARY_TRANSCRIPTION_TIMEOUT = 10 * 60
+ANALYSIS_TIMEOUT = 10 * 60
+
+
+def final_transcription_task(conversation_id):
+    """Full transcription + speaker ID + analysis for a finalized conversation"""
+    try:
+        transcribe_final_audio(conversation_id)
+    except Exception as e:
+        logger.exception("Final transcription task failed for conversation %s", conversation_id)
+        # Update conversation to mark transcription failed
+        try:
+            conv = ChunkedConversation.objects.get(id=conversation_id)
+            conv.transcription_error = str(e)
+            conv.save(update_fields=['transcription_error', 'updated_at'])
+        except Exception:
+            logger.exception("Could not record transcription error for conversation %s", conversation_id)
+
+
+def preliminary_transcription_task(conversation_id, chunk_ids):
+    """Preliminary (per-chunk) transcription; releases the is_transcribing lock when done"""
+    try:
+        transcribe_chunks_preliminary(conversation_id, chunk_ids)
+    except Exception:
+        logger.exception("Preliminary transcription failed for conversation %s", conversation_id)
+    finally:
+        # Clear flag when done
+        ChunkedConversation.objects.filter(id=conversation_id).update(is_transcribing=False)
+
+
+def analysis_retry_task(conversation_id):
+    """Re-run AI analysis on an existing transcript (retry_analysis endpoint)"""
+    try:
+        conversation = ChunkedConversation.objects.get(id=conversation_id)
+        analyze_conversation(conversation)
+    except Exception:
+        logger.exception("Analysis retry failed for conversation %s", conversation_id)
@@ -12,15 +12,18 @@ from unittest.mock import patch, MagicMock
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 
-from chunking import transcription
+from chunking import transcription, views
 from chunking.models import (
     ChunkedConversation,
     Speaker,
     TranscriptSegment,
 )
+from history.models import DispatchJob
 from streaming.models import AnalysisPrompt, UserProfile
+from streaming_transcriber import clients
 
 
 def _fake_chat_response(content):
@@ -44,6 +47,7 @@ class IdentifySpeakersWithAITests(TestCase):
     """Verify speaker-identification call uses the right model and parameters."""
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username="sam", first_name="Sam", last_name="Tech"
         )
@@ -112,6 +116,7 @@ class IdentifySpeakersWithAITests(TestCase):
             "max_tokens", kwargs,
             "GPT-5 family uses max_completion_tokens, not max_tokens.",
         )
+        self.assertEqual(kwargs.get("response_format"), {"type": "json_object"})
 
     @patch("chunking.transcription.get_openai_client")
     def test_prompt_contains_chronological_dialogue_with_labels(self, mock_client_factory):
@@ -129,6 +134,36 @@ class IdentifySpeakersWithAITests(TestCase):
         self.assertIn("Speaker A: Hi, this is Sam.", sent_prompt)
         self.assertIn("Speaker B: Hey Sam, I'm Pat.", sent_prompt)
 
+    @patch("chunking.transcription.get_openai_client")
+    def test_prebuilt_dialogue_is_used_as_is(self, mock_client_factory):
+        # transcribe_final_audio hands over the dialogue it built while
+        # creating segments, so the segments aren't read back.
+        client = MagicMock()
+        client.chat.completions.create.return_value = self._batched_response([])
+        mock_client_factory.return_value = client
+
+        transcription.identify_speakers_with_ai(
+            self.conversation, dialogue_text="Speaker A: Prebuilt line."
+        )
+
+        sent_prompt = client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("Speaker A: Prebuilt line.", sent_prompt)
+        self.assertNotIn("Hi, this is Sam.", sent_prompt)
+
+    @patch("chunking.transcription.get_openai_client")
+    def test_single_speaker_skips_the_call_and_is_left_untouched(self, mock_client_factory):
+        client = MagicMock()
+        mock_client_factory.return_value = client
+        Speaker.objects.filter(conversation=self.conversation, speaker_label="Speaker B").delete()
+        Speaker.objects.filter(pk=self.speaker.pk).update(identified_name="Customer")
+
+        transcription.identify_speakers_with_ai(self.conversation)
+
+        client.chat.completions.create.assert_not_called()
+        self.speaker.refresh_from_db()
+        self.assertEqual(self.speaker.identified_name, "Customer")
+        self.assertFalse(self.speaker.is_recording_user)
+
     @patch("chunking.transcription.get_openai_client")
     def test_applies_identifications_per_label(self, mock_client_factory):
         client = MagicMock()
@@ -163,6 +198,27 @@ class IdentifySpeakersWithAITests(TestCase):
         self.assertEqual(speaker_b.identified_name, "Pat")
         self.assertFalse(speaker_b.is_recording_user)
 
+    @patch("chunking.transcription.cache")
+    @patch("chunking.transcription.get_openai_client")
+    def test_cache_outage_still_identifies_speakers(self, mock_client_factory, mock_cache):
+        mock_cache.get.side_effect = ConnectionError("redis down")
+        mock_cache.set.side_effect = ConnectionError("redis down")
+        client = MagicMock()
+        client.chat.completions.create.return_value = self._batched_response([
+            {"speaker_label": "Speaker A", "identified_name": "Sam Tech", "is_recording_user": True},
+            {"speaker_label": "Speaker B", "identified_name": "Pat", "is_recording_user": False},
+        ])
+        mock_client_factory.return_value = client
+
+        transcription.identify_speakers_with_ai(self.conversation)
+
+        client.chat.completions.create.assert_called_once()
+        names = dict(
+            Speaker.objects.filter(conversation=self.conversation)
+            .values_list("speaker_label", "identified_name")
+        )
+        self.assertEqual(names, {"Speaker A": "Sam Tech", "Speaker B": "Pat"})
+
     @patch("chunking.transcription.get_openai_client")
     def test_recording_user_substring_fallback(self, mock_client_factory):
         # If the model forgets to set is_recording_user but the identified
@@ -221,6 +277,88 @@ class IdentifySpeakersWithAITests(TestCase):
         # Should not raise.
         transcription.identify_speakers_with_ai(self.conversation)
 
+    @patch("chunking.transcription.get_openai_client")
+    def test_static_instructions_are_in_system_message(self, mock_client_factory):
+        # Keeping the prompt prefix identical across calls is what lets
+        # OpenAI's prompt caching apply.
+        client = MagicMock()
+        client.chat.completions.create.return_value = self._batched_response([])
+        mock_client_factory.return_value = client
+
+        transcription.identify_speakers_with_ai(self.conversation)
+
+        messages = client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertEqual(messages[0]["content"], transcription.SPEAKER_ID_SYSTEM_PROMPT)
+        self.assertNotIn("IDENTIFICATION CRITERIA", messages[1]["content"])
+
+    @patch("chunking.transcription.get_openai_client")
+    def test_unchanged_transcript_reuses_cached_identification(self, mock_client_factory):
+        client = MagicMock()
+        client.chat.completions.create.return_value = self._batched_response([
+            {
+                "speaker_label": "Speaker B",
+                "identified_name": "Pat",
+                "is_recording_user": False,
+                "confidence": "high",
+                "reasoning": "Introduced as Pat.",
+            },
+        ])
+        mock_client_factory.return_value = client
+
+        transcription.identify_speakers_with_ai(self.conversation)
+        transcription.identify_speakers_with_ai(self.conversation)
+
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        speaker_b = Speaker.objects.get(conversation=self.conversation, speaker_label="Speaker B")
+        self.assertEqual(speaker_b.identified_name, "Pat")
+
+
+class CreateSpeakersAndSegmentsTests(TestCase):
+    """Speakers and segments come straight from AssemblyAI's utterances."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="sam")
+        UserProfile.objects.create(user=self.user)
+        self.conversation = _make_conversation(self.user)
+        self.transcript = SimpleNamespace(utterances=[
+            SimpleNamespace(speaker="A", text="Hi, this is Sam.", start=0, end=2000, confidence=0.9),
+            SimpleNamespace(speaker="B", text="Hey Sam, I'm Pat.", start=2000, end=4000, confidence=0.8),
+            SimpleNamespace(speaker="A", text="How can I help?", start=4000, end=6000, confidence=0.95),
+        ])
+
+    def test_creates_one_segment_per_utterance_in_order(self):
+        transcription.create_speakers_and_segments(self.conversation, self.transcript)
+
+        segments = list(
+            TranscriptSegment.objects.filter(conversation=self.conversation)
+            .values_list("speaker__speaker_label", "text", "start_time")
+        )
+        self.assertEqual(segments, [
+            ("A", "Hi, this is Sam.", 0),
+            ("B", "Hey Sam, I'm Pat.", 2000),
+            ("A", "How can I help?", 4000),
+        ])
+
+    def test_returns_chronological_dialogue(self):
+        dialogue = transcription.create_speakers_and_segments(self.conversation, self.transcript)
+
+        self.assertEqual(dialogue, "A: Hi, this is Sam.\nB: Hey Sam, I'm Pat.\nA: How can I help?")
+
+    def test_reuses_existing_speakers(self):
+        existing = Speaker.objects.create(conversation=self.conversation, speaker_label="A")
+
+        transcription.create_speakers_and_segments(self.conversation, self.transcript)
+
+        self.assertEqual(Speaker.objects.filter(conversation=self.conversation).count(), 2)
+        self.assertEqual(
+            TranscriptSegment.objects.filter(speaker=existing).count(), 2
+        )
+
+    def test_query_count_does_not_grow_with_speakers(self):
+        # SELECT existing speakers, INSERT missing ones, INSERT segments
+        with self.assertNumQueries(3):
+            transcription.create_speakers_and_segments(self.conversation, self.transcript)
+
 
 class AnalyzeConversationTests(TestCase):
     """Verify the conversation-analysis call uses the right model and parameters."""
@@ -563,15 +701,15 @@ class GetOpenAIClientTests(TestCase):
     def setUp(self):
         # The factory is lru_cache'd, so flush before each test so we observe
         # the next OpenAI(...) construction.
-        transcription.get_openai_client.cache_clear()
+        clients.get_openai_client.cache_clear()
 
     def tearDown(self):
-        transcription.get_openai_client.cache_clear()
+        clients.get_openai_client.cache_clear()
 
-    @patch("chunking.transcription.OpenAI")
+    @patch("streaming_transcriber.clients.OpenAI")
     def test_client_constructed_with_max_retries(self, mock_openai_cls):
         with self.settings(OPENAI_API_KEY="sk-test"):
-            transcription.get_openai_client()
+            clients.get_openai_client()
 
         mock_openai_cls.assert_called_once()
         kwargs = mock_openai_cls.call_args.kwargs
@@ -626,3 +764,58 @@ class FormatAnalysisAsTextTests(TestCase):
             {"summary": "ok"}, prompt=prompt
         )
         self.assertIn("Analysis: Sales QA", result)
+
+
+class StripJsonFencesTests(TestCase):
+    """Model responses sometimes arrive wrapped in markdown code fences."""
+
+    def test_strips_json_fence(self):
+        self.assertEqual(
+            transcription.strip_json_fences('```json\n{"a": 1}\n```'), '{"a": 1}'
+        )
+
+    def test_strips_bare_fence(self):
+        self.assertEqual(
+            transcription.strip_json_fences('```\n{"a": 1}\n```\n'), '{"a": 1}'
+        )
+
+    def test_leaves_unfenced_json_alone(self):
+        self.assertEqual(transcription.strip_json_fences(' {"a": 1} '), '{"a": 1}')
+
+
+class GetDispatchedEmployeesTests(TestCase):
+    """Dispatch webhooks reuse the active row for an appointment/tech pair."""
+
+    def setUp(self):
+        user = User.objects.create_user(username="tech", password="pw")
+        UserProfile.objects.create(user=user, st_id="3027961")
+
+    @patch("chunking.views.async_task")
+    @patch("chunking.views.appointment_assignments_api_call")
+    def test_active_row_with_different_job_id_is_reused(self, mock_assignments, mock_async_task):
+        existing = DispatchJob.objects.create(
+            job_id="111", appointment_id="555", tech_id="3027961", status="Dispatched"
+        )
+        mock_assignments.return_value = [
+            {"technicianId": 3027961, "jobId": 222},
+        ]
+
+        self.assertTrue(views.get_dispatched_employees("555", "c1", "l1"))
+
+        self.assertEqual(list(DispatchJob.objects.filter(active=True)), [existing])
+        mock_async_task.assert_not_called()
+
+    @patch("chunking.views.async_task")
+    @patch("chunking.views.appointment_assignments_api_call")
+    def test_new_assignment_creates_row_and_queues_document(self, mock_assignments, mock_async_task):
+        mock_assignments.return_value = [
+            {"technicianId": 3027961, "jobId": 222},
+        ]
+
+        self.assertTrue(views.get_dispatched_employees("555", "c1", "l1"))
+
+        job = DispatchJob.objects.get(active=True)
+        self.assertEqual((job.job_id, job.appointment_id, job.tech_id), ("222", "555", "3027961"))
+        mock_async_task.assert_called_once_with(
+            'history.tasks.build_ai_job_document', job.id, "c1", "l1"
+        )
@@ -10,16 +10,22 @@ PLUS: AI-powered analysis (summary, action items, coaching)
 
 import assemblyai as aai
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
-from openai import OpenAI
-import json
+import hashlib
+import orjson
+import logging
 import re
 import os
 import tempfile
 import subprocess
+import threading
 from datetime import timedelta
-from .s3_handler_hybrid import generate_presigned_download_url, get_s3_client, sanitize_username_for_s3
-from functools import lru_cache
+from .s3_handler_hybrid import generate_presigned_download_url, sanitize_username_for_s3
+from streaming_transcriber.clients import get_openai_client, get_s3_client
+
+logger = logging.getLogger(__name__)
 
 # Initialize clients
 aai.settings.api_key = settings.ASSEMBLYAI_API_KEY
@@ -31,22 +37,13 @@ aai.settings.api_key = settings.ASSEMBLYAI_API_KEY
 #    print("⚠️ OpenAI API key not found - AI analysis will be skipped")
 
 
-@lru_cache(maxsize=1)
-def get_openai_client():
-    """
-    Lazily initialize and cache the OpenAI client.
-    Ensures it's created once per process and reused safely.
+# Leading ```json / ``` and trailing ``` that models sometimes wrap JSON in
+_JSON_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
 
-    max_retries=3 is the SDK's built-in retry-with-backoff for transient
-    failures (network errors, 5xx responses) — without it, a single blip
-    during transcription stamps transcription_error and ends the run.
-    """
-    api_key = getattr(settings, "OPENAI_API_KEY", None)
-    if not api_key:
-        print("⚠️ OpenAI API key not found - AI analysis will be skipped")
-        return None
-    print("✅ OpenAI client initialized (cached)")
-    return OpenAI(api_key=api_key, max_retries=3)
+
+def strip_json_fences(text):
+    """Strip markdown code fences from a model response so it can be orjson.loads'd."""
+    return _JSON_FENCE_RE.sub("", text).strip()
 
 
 # === AUDIO PREPROCESSING ===
@@ -210,7 +207,7 @@ def transcribe_with_whisper(conversation, audio_path):
         # Segments are Pydantic TranscriptionSegment objects in openai>=1.x —
         # use attribute access, not dict-style .get().
         formatted_lines = []
-        if hasattr(response, 'segments') and response.segments:
+        if getattr(response, 'segments', None):
             for segment in response.segments:
                 start_seconds = int(getattr(segment, 'start', 0) or 0)
                 minutes = start_seconds // 60
@@ -226,7 +223,7 @@ def transcribe_with_whisper(conversation, audio_path):
             conversation.whisper_formatted_transcript = transcript_text
 
         conversation.whisper_transcript = transcript_text
-        conversation.save()
+        conversation.save(update_fields=['whisper_transcript', 'whisper_formatted_transcript', 'updated_at'])
 
         print(f"✅ Whisper formatted transcript: {len(formatted_lines)} segments")
         return transcript_text
@@ -367,18 +364,26 @@ def transcribe_chunks_preliminary(conversation_id, chunk_ids):
 
     try:
         conversation = ChunkedConversation.objects.get(id=conversation_id)
-        chunks = AudioChunk.objects.filter(
+        # Evaluate once: exists()/count()/iteration would each run a query
+        chunks = list(AudioChunk.objects.filter(
             id__in=chunk_ids,
             conversation=conversation
-        ).order_by('chunk_number')
+        ).order_by('chunk_number'))
 
-        if not chunks.exists():
+        if not chunks:
             print(f"âš ï¸ No chunks found for preliminary transcription")
             return False
 
-        print(f"ðŸŽ¤ Starting preliminary transcription for {chunks.count()} chunk(s)")
+        print(f"ðŸŽ¤ Starting preliminary transcription for {len(chunks)} chunk(s)")
 
-        transcriber = aai.Transcriber()
+        # Configure for speed (no speaker diarization); the same config and
+        # transcriber serve every chunk in the batch
+        config = aai.TranscriptionConfig(
+            speech_model=aai.SpeechModel.nano,  # Fastest model
+            punctuate=True,
+            format_text=True
+        )
+        transcriber = aai.Transcriber(config=config)
 
         for chunk in chunks:
             if chunk.transcript_text and chunk.transcript_source == 'preliminary':
@@ -394,20 +399,8 @@ def transcribe_chunks_preliminary(conversation_id, chunk_ids):
                 print(f"   âŒ Failed to generate presigned URL for chunk {chunk.chunk_number}")
                 continue
 
-            print(f"   ðŸ”— Using presigned URL for transcription")
-
-            # Configure for speed (no speaker diarization)
-            config = aai.TranscriptionConfig(
-                speech_model=aai.SpeechModel.nano,  # Fastest model
-                punctuate=True,
-                format_text=True
-            )
-
             # Submit chunk presigned URL for transcription
-            transcript = transcriber.transcribe(
-                presigned_url,
-                config=config
-            )
+            transcript = transcriber.transcribe(presigned_url)
 
             if transcript.status == aai.TranscriptStatus.error:
                 print(f"   âŒ Transcription failed for chunk {chunk.chunk_number}: {transcript.error}")
@@ -417,8 +410,8 @@ def transcribe_chunks_preliminary(conversation_id, chunk_ids):
             chunk.transcript_text = transcript.text
             chunk.transcript_source = 'preliminary'
             chunk.transcribed_at = timezone.now()
-            chunk.confidence_score = transcript.confidence if hasattr(transcript, 'confidence') else None
-            chunk.save()
+            chunk.confidence_score = getattr(transcript, 'confidence', None)
+            chunk.save(update_fields=['transcript_text', 'transcript_source', 'transcribed_at', 'confidence_score'])
 
             print(f"   âœ… Chunk {chunk.chunk_number} transcribed: {len(transcript.text)} chars")
 
@@ -427,7 +420,7 @@ def transcribe_chunks_preliminary(conversation_id, chunk_ids):
 
         # Update last preliminary transcription timestamp
         conversation.last_preliminary_transcription = timezone.now()
-        conversation.save()
+        conversation.save(update_fields=['last_preliminary_transcription', 'updated_at'])
 
         print(f"âœ… Preliminary transcription complete")
         return True
@@ -449,14 +442,14 @@ def stitch_preliminary_transcript(conversation):
     """
     from .models import AudioChunk
 
-    chunks = AudioChunk.objects.filter(
+    chunks = list(AudioChunk.objects.filter(
         conversation=conversation,
         transcript_source='preliminary'
     ).exclude(
         transcript_text=''
-    ).order_by('chunk_number')
+    ).order_by('chunk_number').only('start_time_seconds', 'transcript_text'))
 
-    if not chunks.exists():
+    if not chunks:
         return
 
     transcript_parts = []
@@ -471,7 +464,7 @@ def stitch_preliminary_transcript(conversation):
 
     # Join with double newlines for readability
     conversation.preliminary_transcript = "\n\n".join(transcript_parts)
-    conversation.save()
+    conversation.save(update_fields=['preliminary_transcript', 'updated_at'])
 
     print(f"ðŸ“ Stitched preliminary transcript: {len(conversation.preliminary_transcript)} chars")
 
@@ -508,6 +501,16 @@ def run_whisper_comparison(conversation):
             os.remove(audio_path)
 
 
+def _run_whisper_comparison_in_thread(conversation):
+    """Thread target for run_whisper_comparison; releases the thread's DB connection."""
+    try:
+        run_whisper_comparison(conversation)
+    except Exception as e:
+        print(f"   ⚠️ Whisper comparison failed: {e}")
+    finally:
+        connection.close()
+
+
 def transcribe_final_audio(conversation_id):
     """
     Transcribe the complete audio file with high quality and speaker diarization.
@@ -529,7 +532,7 @@ def transcribe_final_audio(conversation_id):
             error_msg = f"No final audio URL for conversation {conversation_id}"
             print(f"âŒ {error_msg}")
             conversation.transcription_error = error_msg
-            conversation.save()
+            conversation.save(update_fields=['transcription_error', 'updated_at'])
             return False
 
         print(f"ðŸŽ¤ Starting FINAL transcription for conversation {conversation_id}")
@@ -549,7 +552,7 @@ def transcribe_final_audio(conversation_id):
             error_msg = "Failed to generate presigned URL for final audio"
             print(f"âŒ {error_msg}")
             conversation.transcription_error = error_msg
-            conversation.save()
+            conversation.save(update_fields=['transcription_error', 'updated_at'])
             return False
 
         print(f"   🔗 Presigned URL ready for transcription")
@@ -579,42 +582,55 @@ def transcribe_final_audio(conversation_id):
             error_msg = f"Final transcription failed: {transcript.error}"
             print(f"âŒ {error_msg}")
             conversation.transcription_error = error_msg
-            conversation.save()
+            conversation.save(update_fields=['transcription_error', 'updated_at'])
             return False
 
         print(f"âœ… Final transcription complete")
         print(f"   Text length: {len(transcript.text)} chars")
-        print(f"   Speakers detected: {len(set([u.speaker for u in transcript.utterances])) if transcript.utterances else 0}")
 
         # Save full transcript text
         conversation.full_transcript = transcript.text
         conversation.transcription_error = ""  # Clear any previous errors
-        conversation.save()
+        conversation.save(update_fields=['full_transcript', 'transcription_error', 'updated_at'])
 
-        # Create Speaker and TranscriptSegment records
-        if transcript.utterances:
-            create_speakers_and_segments(conversation, transcript)
+        # === WHISPER TRANSCRIPTION (opt-in comparison) ===
+        # Independent of the speaker ID -> formatting -> analysis chain below
+        # (its own API calls, its own columns), so it runs alongside that chain
+        # instead of adding its round trips to the end of it.
+        whisper_thread = None
+        if conversation.transcription_service_preference == 'both':
+            whisper_thread = threading.Thread(
+                target=_run_whisper_comparison_in_thread,
+                args=(conversation,),
+                daemon=True
+            )
+            whisper_thread.start()
 
-        # Identify speakers using AI
         openai_client = get_openai_client()
-        if openai_client and transcript.utterances:
-            identify_speakers_with_ai(conversation)
 
-        # Generate formatted transcript with speaker names
+        # Speaker/segment work only applies when the transcript has utterances;
+        # without them there is nothing to create, identify or format
         if transcript.utterances:
-            generate_formatted_transcript(conversation)
+            # Create Speaker and TranscriptSegment records
+            dialogue_text = create_speakers_and_segments(conversation, transcript)
 
-        # === WHISPER TRANSCRIPTION (opt-in comparison) ===
-        run_whisper_comparison(conversation)
+            # Identify speakers using AI
+            if openai_client:
+                identify_speakers_with_ai(conversation, dialogue_text=dialogue_text)
+
+            # Generate formatted transcript with speaker names
+            generate_formatted_transcript(conversation)
 
         # Generate conversation analysis
-        openai_client = get_openai_client()
         if openai_client:
             analyze_conversation(conversation)
 
+        if whisper_thread:
+            whisper_thread.join()
+
         # Mark as analyzed
         conversation.is_analyzed = True
-        conversation.save()
+        conversation.save(update_fields=['is_analyzed', 'updated_at'])
 
         print(f"âœ… Final analysis complete for conversation {conversation_id}")
         return True
@@ -628,7 +644,7 @@ def transcribe_final_audio(conversation_id):
         try:
             conversation = ChunkedConversation.objects.get(id=conversation_id)
             conversation.transcription_error = error_msg
-            conversation.save()
+            conversation.save(update_fields=['transcription_error', 'updated_at'])
         except Exception as save_err:
             # Recovery itself failed — log so the original error doesn't get
             # double-buried. We still return False below.
@@ -644,45 +660,100 @@ def create_speakers_and_segments(conversation, transcript):
     Args:
         conversation: ChunkedConversation instance
         transcript: AssemblyAI transcript object
+
+    Returns:
+        str: The dialogue as "Speaker X: text" lines in chronological order,
+        built while the utterances are in hand so speaker identification
+        doesn't have to read every segment back from the database.
     """
     from .models import Speaker, TranscriptSegment
 
-    print(f"ðŸ‘¥ Creating speakers and segments...")
+    logger.debug("Creating speakers and segments for conversation %s", conversation.id)
 
     # Get unique speaker labels
-    speaker_labels = set([u.speaker for u in transcript.utterances])
-
-    # Create Speaker records
-    speakers_map = {}
-    for label in speaker_labels:
-        speaker, created = Speaker.objects.get_or_create(
-            conversation=conversation,
-            speaker_label=label
-        )
-        speakers_map[label] = speaker
-
-        if created:
-            print(f"   Created speaker: {label}")
-
-    # Create TranscriptSegment records
-    segment_count = 0
+    speaker_labels = {u.speaker for u in transcript.utterances}
+
+    # Create Speaker records: one SELECT for the ones a previous run already
+    # created, one INSERT for the rest (instead of get_or_create per label)
+    speakers_map = {
+        s.speaker_label: s
+        for s in Speaker.objects.filter(conversation=conversation, speaker_label__in=speaker_labels)
+    }
+    missing = [
+        Speaker(conversation=conversation, speaker_label=label)
+        for label in sorted(speaker_labels - speakers_map.keys())
+    ]
+    if missing:
+        Speaker.objects.bulk_create(missing)
+        for speaker in missing:
+            speakers_map[speaker.speaker_label] = speaker
+        logger.debug("Created speakers: %s", ", ".join(s.speaker_label for s in missing))
+
+    # Create TranscriptSegment records in batches rather than one INSERT each
+    segments = []
+    dialogue_lines = []
     for utterance in transcript.utterances:
         speaker = speakers_map[utterance.speaker]
+        dialogue_lines.append(f"{utterance.speaker or 'Unknown'}: {utterance.text}")
 
-        TranscriptSegment.objects.create(
+        segments.append(TranscriptSegment(
             conversation=conversation,
             speaker=speaker,
             text=utterance.text,
             start_time=utterance.start,  # milliseconds
             end_time=utterance.end,  # milliseconds
-            confidence=utterance.confidence if hasattr(utterance, 'confidence') else None
-        )
-        segment_count += 1
+            confidence=getattr(utterance, 'confidence', None)
+        ))
+
+    TranscriptSegment.objects.bulk_create(segments, batch_size=500)
+
+    logger.info("Created %d speakers and %d segments", len(speakers_map), len(segments))
+    return "\n".join(dialogue_lines)
+
+
+SPEAKER_ID_CACHE_TTL = 60 * 60  # 1 hour
+
+# Static instructions live in the system message so the prefix is identical on
+# every call and OpenAI's automatic prompt caching can reuse it; only the
+# recording details and transcript go in the user message.
+SPEAKER_ID_SYSTEM_PROMPT = """You are an expert at analyzing conversations to identify speakers based on dialogue and context clues.
+
+IDENTIFICATION CRITERIA:
+For each speaker, look for these clues:
+1. Direct self-introduction: "Hi, I'm John" / "This is Sarah calling"
+2. Name mentioned by others: "Thanks, Michael" / "Susan, can you help?"
+3. Role indicators: "As your sales rep..." / "I'm calling from..."
+4. Context clues: business names, relationship cues
+
+CROSS-SPEAKER REASONING:
+- If Speaker B says "Thanks, Sam" and "Sam" doesn't appear in Speaker B's own lines,
+  Sam is most likely Speaker A.
+- If a speaker is clearly the person who made the recording (named in the
+  RECORDING INFORMATION), mark them with "is_recording_user": true.
 
-    print(f"âœ… Created {len(speakers_map)} speakers and {segment_count} segments")
+CONFIDENCE GUIDELINES:
+- "high": direct introduction or unambiguous name reference
+- "medium": strong contextual clues
+- "low": weak or ambiguous evidence — set identified_name to "Unknown"
 
+RESPONSE FORMAT:
+Respond with ONLY a valid JSON object (no markdown, no explanation).
+Include one entry per speaker, using the exact speaker_label strings provided.
 
-def identify_speakers_with_ai(conversation):
+{
+  "speakers": [
+    {
+      "speaker_label": "Speaker A",
+      "identified_name": "First Last" or "Unknown",
+      "is_recording_user": true or false,
+      "confidence": "high" or "medium" or "low",
+      "reasoning": "Brief explanation"
+    }
+  ]
+}"""
+
+
+def identify_speakers_with_ai(conversation, dialogue_text=None):
     """
     Use AI to identify all speakers in a single batched call.
 
@@ -690,123 +761,119 @@ def identify_speakers_with_ai(conversation):
     is Sam) is what makes one batched call more accurate than the previous
     per-speaker approach — and it costs ~1/N the API calls.
 
+    Monologue recordings (one diarized speaker) skip the call entirely; the
+    speaker record is left unmodified.
+
     Args:
         conversation: ChunkedConversation instance
+        dialogue_text: Optional pre-built "Speaker X: text" dialogue (as
+            returned by create_speakers_and_segments). When omitted, it is
+            rebuilt from the conversation's TranscriptSegment rows.
     """
     from .models import Speaker, TranscriptSegment
 
     openai_client = get_openai_client()
     if not openai_client:
-        print("⚠️ OpenAI client not configured, skipping speaker identification")
+        logger.warning("OpenAI client not configured, skipping speaker identification")
         return
 
     speakers = list(Speaker.objects.filter(conversation=conversation))
     if not speakers:
-        print("   No speakers to identify")
+        logger.debug("No speakers to identify")
         return
 
-    print(f"🤖 Identifying {len(speakers)} speaker(s) in one batched call...")
+    # With a single diarized voice there is nobody to tell apart, so skip
+    # the model call. The speaker is left as-is: one voice isn't necessarily
+    # the recorder (a voicemail, a customer near the phone, or two voices
+    # diarization merged).
+    if len(speakers) == 1:
+        logger.debug("Single speaker %s, skipping identification", speakers[0].speaker_label)
+        return
 
     recording_user_name = (
         conversation.recorded_by.get_full_name()
         or conversation.recorded_by.username
     )
 
+    logger.debug("Identifying %d speaker(s) in one batched call", len(speakers))
+
     # Build the conversation in chronological order with anonymous speaker
     # labels. Cross-speaker reasoning lives or dies on having all utterances
     # in their original sequence.
-    segments = (
-        TranscriptSegment.objects
-        .filter(conversation=conversation)
-        .select_related("speaker")
-        .order_by("start_time")
-    )
-    dialogue_lines = []
-    for seg in segments:
-        label = seg.speaker.speaker_label if seg.speaker else "Unknown"
-        dialogue_lines.append(f"{label}: {seg.text}")
-    dialogue_text = "\n".join(dialogue_lines)
+    # Only two columns are needed per utterance, so stream plain tuples
+    # instead of building a TranscriptSegment + Speaker instance per row.
+    if dialogue_text is None:
+        rows = (
+            TranscriptSegment.objects
+            .filter(conversation=conversation)
+            .order_by("start_time")
+            .values_list("speaker__speaker_label", "text")
+            .iterator(chunk_size=500)
+        )
+        dialogue_text = "\n".join(f"{label or 'Unknown'}: {text}" for label, text in rows)
 
     speaker_labels_quoted = ", ".join(f'"{s.speaker_label}"' for s in speakers)
 
-    prompt = f"""You are an expert at analyzing conversations to identify speakers based on dialogue and context clues.
-
-RECORDING INFORMATION:
+    prompt = f"""RECORDING INFORMATION:
 - This recording was made by: {recording_user_name}
 - The conversation contains these speakers (anonymous labels): {speaker_labels_quoted}
 
 CONVERSATION (chronological, with anonymous speaker labels):
-{dialogue_text}
-
-IDENTIFICATION CRITERIA:
-For each speaker, look for these clues:
-1. Direct self-introduction: "Hi, I'm John" / "This is Sarah calling"
-2. Name mentioned by others: "Thanks, Michael" / "Susan, can you help?"
-3. Role indicators: "As your sales rep..." / "I'm calling from..."
-4. Context clues: business names, relationship cues
-
-CROSS-SPEAKER REASONING:
-- If Speaker B says "Thanks, Sam" and "Sam" doesn't appear in Speaker B's own lines,
-  Sam is most likely Speaker A.
-- If a speaker is clearly the recording user ({recording_user_name}), mark them with
-  "is_recording_user": true.
+{dialogue_text}"""
 
-CONFIDENCE GUIDELINES:
-- "high": direct introduction or unambiguous name reference
-- "medium": strong contextual clues
-- "low": weak or ambiguous evidence — set identified_name to "Unknown"
+    # Re-finalizing the same audio (iOS upload retries) produces the same
+    # prompt; reuse the earlier answer instead of paying for another call.
+    cache_key = f"spkid:{conversation.id}:{hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()}"
 
-RESPONSE FORMAT:
-Respond with ONLY a valid JSON object (no markdown, no explanation).
-Include one entry per speaker, using the exact speaker_label strings provided above.
-
-{{
-  "speakers": [
-    {{
-      "speaker_label": "Speaker A",
-      "identified_name": "First Last" or "Unknown",
-      "is_recording_user": true or false,
-      "confidence": "high" or "medium" or "low",
-      "reasoning": "Brief explanation"
-    }}
-  ]
-}}"""
+    # The cache is only a shortcut: an unreachable cache is a miss
+    try:
+        identifications = cache.get(cache_key)
+    except Exception:
+        logger.warning("Speaker ID cache read failed for conversation %s", conversation.id, exc_info=True)
+        identifications = None
 
     result_text = ""
     try:
-        response = openai_client.chat.completions.create(
-            model=settings.OPENAI_SPEAKER_ID_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert at analyzing conversations to identify speakers. Always respond with valid JSON only, no markdown formatting."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            # GPT-5.x reasoning models reject non-default temperature; use
-            # reasoning_effort to control output quality/cost instead.
-            reasoning_effort=settings.OPENAI_SPEAKER_ID_REASONING_EFFORT,
-            max_completion_tokens=1500
-        )
+        if identifications is None:
+            response = openai_client.chat.completions.create(
+                model=settings.OPENAI_SPEAKER_ID_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": SPEAKER_ID_SYSTEM_PROMPT
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                # GPT-5.x reasoning models reject non-default temperature; use
+                # reasoning_effort to control output quality/cost instead.
+                reasoning_effort=settings.OPENAI_SPEAKER_ID_REASONING_EFFORT,
+                max_completion_tokens=1500,
+                # JSON mode: the body is a bare JSON object, no fences to strip
+                response_format={"type": "json_object"}
+            )
 
-        result_text = response.choices[0].message.content.strip()
-        result_text = re.sub(r"```json\s*", "", result_text)
-        result_text = re.sub(r"```\s*$", "", result_text)
-        result_text = result_text.strip()
+            result_text = response.choices[0].message.content
 
-        result = json.loads(result_text)
-        identifications = result.get("speakers", [])
+            result = orjson.loads(result_text)
+            identifications = result.get("speakers", [])
+            try:
+                cache.set(cache_key, identifications, SPEAKER_ID_CACHE_TTL)
+            except Exception:
+                logger.warning("Speaker ID cache write failed for conversation %s", conversation.id, exc_info=True)
+        else:
+            logger.debug("Reusing cached speaker identification for conversation %s", conversation.id)
 
         speakers_by_label = {s.speaker_label: s for s in speakers}
+        identified = []
 
         for ident in identifications:
             label = ident.get("speaker_label")
             speaker = speakers_by_label.get(label)
             if not speaker:
-                print(f"   ⚠️ AI returned unknown speaker_label: {label!r}")
+                logger.warning("AI returned unknown speaker_label: %r", label)
                 continue
 
             identified_name = ident.get("identified_name", "Unknown")
@@ -814,8 +881,8 @@ Include one entry per speaker, using the exact speaker_label strings provided ab
             reasoning = ident.get("reasoning", "")
             is_recording_user_flag = bool(ident.get("is_recording_user", False))
 
-            print(f"   {label}: {identified_name} (confidence: {confidence})")
-            print(f"      Reasoning: {reasoning}")
+            logger.debug("%s: %s (confidence: %s)", label, identified_name, confidence)
+            logger.debug("Reasoning: %s", reasoning)
 
             if identified_name and identified_name != "Unknown":
                 speaker.identified_name = identified_name
@@ -827,18 +894,20 @@ Include one entry per speaker, using the exact speaker_label strings provided ab
                     or identified_name.lower() in recording_user_name.lower()
                 ):
                     speaker.is_recording_user = True
-                    print(f"   👤 Marked {label} as recording user")
+                    logger.debug("Marked %s as recording user", label)
+
+                identified.append(speaker)
+                logger.debug("Updated %s -> %s", label, identified_name)
 
-                speaker.save()
-                print(f"   ✅ Updated {label} -> {identified_name}")
+        # One UPDATE for all identified speakers instead of a save() each
+        if identified:
+            Speaker.objects.bulk_update(identified, ['identified_name', 'is_recording_user'])
 
-    except json.JSONDecodeError as e:
-        print(f"   ❌ Failed to parse AI response: {e}")
-        print(f"      Response was: {result_text[:300]}")
+    except orjson.JSONDecodeError as e:
+        logger.error("Failed to parse AI speaker identification: %s", e)
+        logger.error("Response was: %s", result_text[:300])
     except Exception as e:
-        print(f"   ❌ Error in batched speaker identification: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in batched speaker identification: %s", e)
 
 
 def generate_formatted_transcript(conversation):
@@ -853,40 +922,39 @@ def generate_formatted_transcript(conversation):
     """
     from .models import TranscriptSegment
 
-    print(f"📝 Generating formatted transcript...")
+    logger.debug("Generating formatted transcript for conversation %s", conversation.id)
 
-    segments = TranscriptSegment.objects.filter(
+    rows = TranscriptSegment.objects.filter(
         conversation=conversation
-    ).select_related('speaker').order_by('start_time')
-
-    if not segments.exists():
-        print(f"   No segments to format")
-        return
+    ).order_by('start_time').values_list(
+        'speaker__identified_name', 'speaker__speaker_label', 'start_time', 'text'
+    ).iterator(chunk_size=500)
 
     formatted_lines = []
 
-    for segment in segments:
+    for identified_name, speaker_label, start_time, text in rows:
         # Get speaker name (identified name or label)
-        if segment.speaker:
-            speaker_name = segment.speaker.identified_name or segment.speaker.speaker_label
-        else:
-            speaker_name = "Unknown"
+        speaker_name = identified_name or speaker_label or "Unknown"
 
         # Format timestamp (milliseconds to MM:SS)
-        total_seconds = segment.start_time // 1000
+        total_seconds = start_time // 1000
         minutes = total_seconds // 60
         seconds = total_seconds % 60
         timestamp = f"[{minutes}:{seconds:02d}]"
 
         # Format line: [MM:SS] Name: Text
-        line = f"{timestamp} {speaker_name}: {segment.text}"
+        line = f"{timestamp} {speaker_name}: {text}"
         formatted_lines.append(line)
 
+    if not formatted_lines:
+        logger.debug("No segments to format")
+        return
+
     # Join with double newlines for readability
     conversation.formatted_transcript = "\n\n".join(formatted_lines)
-    conversation.save()
+    conversation.save(update_fields=['formatted_transcript', 'updated_at'])
 
-    print(f"✅ Formatted transcript generated: {len(formatted_lines)} segments")
+    logger.debug("Formatted transcript generated: %d segments", len(formatted_lines))
 
 
 def format_analysis_as_text(analysis, prompt=None):
@@ -1066,16 +1134,12 @@ FORMATTING GUIDELINES:
             max_completion_tokens=8000
         )
 
-        result_text = response.choices[0].message.content.strip()
-
         # Clean up markdown if present
-        result_text = re.sub(r'```json\s*', '', result_text)
-        result_text = re.sub(r'```\s*$', '', result_text)
-        result_text = result_text.strip()
+        result_text = strip_json_fences(response.choices[0].message.content)
 
-        analysis = json.loads(result_text)
+        analysis = orjson.loads(result_text)
 
-        print(f"   Raw analysis JSON: {json.dumps(analysis, indent=2)[:500]}...")
+        print(f"   Raw analysis JSON: {orjson.dumps(analysis, option=orjson.OPT_INDENT_2).decode()[:500]}...")
 
         # Convert the JSON analysis to human-readable text
         readable_text = format_analysis_as_text(analysis, assigned_prompt)
@@ -1126,7 +1190,10 @@ FORMATTING GUIDELINES:
 
         conversation.analysis_error = ""  # Clear any previous errors
 
-        conversation.save()
+        conversation.save(update_fields=[
+            'summary', 'coaching_feedback', 'action_items', 'key_topics', 'sentiment',
+            'analysis_error', 'prompt_used', 'updated_at',
+        ])
 
         print(f"✅ Conversation analysis complete")
         print(f"   Using custom prompt: {assigned_prompt.name if assigned_prompt else 'generic'}")
@@ -1140,19 +1207,19 @@ FORMATTING GUIDELINES:
             print(f"   Sentiment: {conversation.sentiment}")
         print(f"   Full analysis stored successfully")
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         error_msg = f"Failed to parse AI analysis: {str(e)}"
         print(f"❌ {error_msg}")
         print(f"   Response was: {result_text[:200]}")
         conversation.analysis_error = error_msg
-        conversation.save()
+        conversation.save(update_fields=['analysis_error', 'prompt_used', 'updated_at'])
     except Exception as e:
         error_msg = f"Error analyzing conversation: {str(e)}"
         print(f"❌ {error_msg}")
         import traceback
         traceback.print_exc()
         conversation.analysis_error = error_msg
-        conversation.save()
+        conversation.save(update_fields=['analysis_error', 'prompt_used', 'updated_at'])
 
 
 
@@ -23,7 +23,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
-import threading
+import logging
 from datetime import datetime
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -32,7 +32,7 @@ from django.contrib import messages
 from django.db.models import Q, Count
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-import json
+import orjson
 from django_q.tasks import async_task
 from history.models import DispatchJob
 from history.st_api import appointment_assignments_api_call
@@ -53,18 +53,23 @@ from .s3_handler_hybrid import (
         get_file_size,
     )
 
-from .transcription import (
-    transcribe_final_audio,
-    search_transcripts
+from .transcription import search_transcripts
+from .tasks import (
+    ANALYSIS_TIMEOUT,
+    FINAL_TRANSCRIPTION_TIMEOUT,
+    PRELIMINARY_TRANSCRIPTION_TIMEOUT,
+    TRANSCRIPTION_CLUSTER,
 )
 
+logger = logging.getLogger(__name__)
+
+
 @csrf_exempt
 def receive_webhook(request): # THIS MEANS A TECHNICIAN JUST DISPATCHED TO A JOB
     print("Technician Dispatched Webhook received")
     jobId = 0
     try:
-        body_unicode = request.body.decode('utf-8')
-        wh = json.loads(body_unicode)
+        wh = orjson.loads(request.body)
         #print(wh)
     except Exception as e:
         print(f"Webhook data decode error: {e}")
@@ -90,21 +95,28 @@ def get_dispatched_employees(appointmentId, customerId, locationId):
     ios_user = False
     try:
         text = "No DispatchJob created"
-        techusers = [str(o.st_id) for o in UserProfile.objects.filter(active=True)]
+        techusers = set(UserProfile.objects.filter(active=True).values_list('st_id', flat=True))
         if appointmentId:
             assignments = appointment_assignments_api_call(appointmentIds=appointmentId)
             for assignment in assignments:
                 print(f"Found appointment assignment for {assignment['technicianId']}")
                 if str(assignment["technicianId"]) in techusers:
+                    # Look up by exactly the unique_active_dispatch_job fields, so
+                    # a concurrent webhook's INSERT loses the race and get_or_create
+                    # falls back to fetching that row; job_id only goes on new rows
                     dispatch_job, created = DispatchJob.objects.get_or_create(
                         active=True,
                         appointment_id=str(appointmentId),
-                        tech_id=assignment["technicianId"],
-                        job_id=str(assignment["jobId"]),
-                        defaults={"status": "Dispatched","polling_active": True}
+                        tech_id=str(assignment["technicianId"]),
+                        defaults={
+                            "job_id": str(assignment["jobId"]),
+                            "status": "Dispatched",
+                            "polling_active": True,
+                        }
                     )
                     print(f"Created? {created}")
-                    # Trigger AI document building in background
+                    # Trigger AI document building in background; the constraint
+                    # means only the webhook that created the row enqueues it
                     if created:
                         async_task('history.tasks.build_ai_job_document', dispatch_job.id, customerId, locationId)
                         print(f"📄 Queued AI document build for job {dispatch_job.job_id}")
@@ -127,7 +139,7 @@ def authenticate_request(request):
         print("Invalid Authorization header!")
         return None, JsonResponse({'error': 'Invalid authorization header'}, status=401)
 
-    token = auth_header.split(' ')[1]
+    token = auth_header[7:].strip()  # len('Bearer ')
     user = get_user_from_token(token)
 
     if not user:
@@ -292,11 +304,11 @@ def finalize_conversation(request, conversation_id):
     # Parse optional title from request
     try:
         if request.body:
-            data = json.loads(request.body)
+            data = orjson.loads(request.body)
             title = data.get('title', '').strip()
             if title:
                 conversation.title = title
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         pass
 
     # Auto-generate title if not provided
@@ -304,32 +316,18 @@ def finalize_conversation(request, conversation_id):
         duration_display = conversation.get_duration_display()
         conversation.title = f"Conversation - {duration_display}"
 
-    conversation.save()
+    conversation.save(update_fields=['is_final_uploaded', 'audio_uploaded_at', 'title', 'updated_at'])
 
     print(f"✅ Final upload verified")
     print(f"   Starting final transcription with speaker diarization...")
 
-    # Trigger final transcription in background with error handling
-    def transcribe_with_error_handling():
-        try:
-            transcribe_final_audio(conversation_id)
-        except Exception as e:
-            print(f"❌ CRITICAL ERROR in final transcription thread: {e}")
-            import traceback
-            traceback.print_exc()
-            # Update conversation to mark transcription failed
-            try:
-                conv = ChunkedConversation.objects.get(id=conversation_id)
-                conv.transcription_error = str(e)
-                conv.save()
-            except:
-                pass
-
-    transcription_thread = threading.Thread(
-        target=transcribe_with_error_handling,
-        daemon=True  # Daemon thread won't prevent app shutdown
+    # Queue final transcription on the django-q worker
+    async_task(
+        'chunking.tasks.final_transcription_task',
+        conversation_id,
+        timeout=FINAL_TRANSCRIPTION_TIMEOUT,
+        cluster=TRANSCRIPTION_CLUSTER
     )
-    transcription_thread.start()
 
     return JsonResponse({
         'success': True,
@@ -366,9 +364,13 @@ def conversation_status(request, conversation_id):
     if error:
         return error
 
-    # Get conversation
+    # Get conversation (status columns only; iOS polls this, and the full row
+    # carries every transcript and analysis TextField)
     try:
-        conversation = ChunkedConversation.objects.get(id=conversation_id, recorded_by=user)
+        conversation = ChunkedConversation.objects.only(
+            'received_chunks', 'chunk_count', 'is_chunks_complete', 'is_final_uploaded',
+            'is_analyzed', 'total_duration_seconds', 'title'
+        ).get(id=conversation_id, recorded_by=user)
     except ChunkedConversation.DoesNotExist:
         return JsonResponse({'error': 'Conversation not found'}, status=404)
 
@@ -475,7 +477,6 @@ def conversation_detail(request, conversation_id):
 
 @csrf_exempt
 def conversation_analysis(request, conversation_id):
-    print("conversation_analysis running!.........")
     """
     GET /chunking/<conversation_id>/analysis/
 
@@ -540,7 +541,7 @@ def conversation_analysis(request, conversation_id):
             'summary': '',
             'error':conversation.analysis_error
         }
-        print(data)
+        logger.debug("Analysis for %s: %s", conversation_id, data)
 
         return JsonResponse(data)
 
@@ -560,7 +561,7 @@ def conversation_analysis(request, conversation_id):
 
             }
 
-    print(data)
+    logger.debug("Analysis for %s: %s", conversation_id, data)
 
     return JsonResponse(data)
 
@@ -608,21 +609,13 @@ def retry_analysis(request, conversation_id):
 
     print(f"🔄 Retrying analysis for conversation {conversation_id}")
 
-    # Run analysis in background
-    def analyze_with_error_handling():
-        try:
-            from .transcription import analyze_conversation
-            analyze_conversation(conversation)
-        except Exception as e:
-            print(f"❌ Error in analysis retry: {e}")
-            import traceback
-            traceback.print_exc()
-
-    analysis_thread = threading.Thread(
-        target=analyze_with_error_handling,
-        daemon=True
+    # Run analysis on the worker
+    async_task(
+        'chunking.tasks.analysis_retry_task',
+        conversation_id,
+        timeout=ANALYSIS_TIMEOUT,
+        cluster=TRANSCRIPTION_CLUSTER
     )
-    analysis_thread.start()
 
     return JsonResponse({
         'success': True,
@@ -669,7 +662,7 @@ def toggle_share(request, conversation_id):
     # Parse optional explicit value from request
     try:
         if request.body:
-            data = json.loads(request.body)
+            data = orjson.loads(request.body)
             explicit_value = data.get('is_shared')
             if explicit_value is not None:
                 conversation.is_shared = bool(explicit_value)
@@ -679,11 +672,11 @@ def toggle_share(request, conversation_id):
         else:
             # No body, toggle
             conversation.is_shared = not conversation.is_shared
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         # Toggle if invalid JSON
         conversation.is_shared = not conversation.is_shared
 
-    conversation.save()
+    conversation.save(update_fields=['is_shared', 'updated_at'])
 
     status_text = "shared" if conversation.is_shared else "private"
     print(f"🔒 Conversation {conversation_id} marked as {status_text}")
@@ -697,7 +690,6 @@ def toggle_share(request, conversation_id):
 
 @csrf_exempt
 def recent_summaries(request):
-    print("recent_summaries() is running!.........")
     """
     GET /chunking/recent-summaries/
 
@@ -735,6 +727,8 @@ def recent_summaries(request):
     conversations = ChunkedConversation.objects.filter(
         recorded_by=user,
         is_analyzed=True
+    ).only(
+        'started_at', 'ended_at', 'job_number', 'customer_name', 'is_shared', 'total_duration_seconds'
     ).order_by('-started_at')[:10]
 
     # Serialize
@@ -806,8 +800,11 @@ def conversation_list(request):
     # Get total count
     total = conversations.count()
 
-    # Apply pagination
-    conversations = conversations.order_by('-started_at')[offset:offset + limit]
+    # Apply pagination (list columns only, not the transcripts)
+    conversations = conversations.only(
+        'title', 'started_at', 'total_duration_seconds', 'chunk_count', 'is_chunks_complete',
+        'is_final_uploaded', 'is_analyzed', 'save_permanently'
+    ).order_by('-started_at')[offset:offset + limit]
 
     # Serialize
     conversations_data = [
@@ -1058,10 +1055,10 @@ def upload_chunk(request):
     if not chunk_data:
         return JsonResponse({'error': 'No audio data'}, status=400)
 
-    print(f"📦 Chunk {chunk_number} for {conversation_id}")
-    print(f"   Size: {len(chunk_data):,} bytes")
-    print(f"   Start: {chunk_start_time}s, Duration: {chunk_duration}s")
-    print(f"   Final: {is_final_chunk}")
+    logger.debug(
+        "Chunk %s for %s: %s bytes, start %ss, duration %ss, final %s",
+        chunk_number, conversation_id, len(chunk_data), chunk_start_time, chunk_duration, is_final_chunk
+    )
 
     # Validate start_time (server-side check)
     expected_start = chunk_number * 30
@@ -1123,7 +1120,10 @@ def upload_chunk(request):
                 conversation.multipart_s3_key = result['s3_key']
                 conversation.final_audio_url = result['s3_url']
                 conversation.multipart_parts = []
-                conversation.save()
+                conversation.save(update_fields=[
+                    'multipart_upload_id', 'multipart_s3_key', 'final_audio_url',
+                    'multipart_parts', 'updated_at'
+                ])
 
                 print(f"Multipart initialized: {result['upload_id']}")
 
@@ -1153,19 +1153,6 @@ def upload_chunk(request):
             'details': upload_result.get('error')
         }, status=500)
 
-    # Save part info
-    parts = conversation.multipart_parts or []
-    parts.append({
-        'part_number': upload_result['part_number'],
-        'etag': upload_result['part_etag']
-    })
-    conversation.multipart_parts = parts
-
-    if not conversation.chunks_folder_path:
-        conversation.chunks_folder_path = upload_result['chunks_folder']
-
-    conversation.save()
-
     print(f"✅ Chunk {chunk_number} uploaded")
 
     # Create AudioChunk record
@@ -1180,16 +1167,36 @@ def upload_chunk(request):
         speech_percentage=float(speech_percentage) if speech_percentage else None
     )
 
-    # Update received chunks
-    received_chunks = conversation.received_chunks or []
-    if chunk_number not in received_chunks:
-        received_chunks.append(chunk_number)
-        received_chunks.sort()
-        conversation.received_chunks = received_chunks
+    # Record the part and the received chunk in one write. Re-read the row
+    # under lock: chunks upload concurrently, and appending to the JSON lists
+    # on the copy loaded above would drop entries written by other requests.
+    with transaction.atomic():
+        conversation = ChunkedConversation.objects.select_for_update().get(id=conversation_id)
+
+        # Save part info
+        parts = conversation.multipart_parts or []
+        parts.append({
+            'part_number': upload_result['part_number'],
+            'etag': upload_result['part_etag']
+        })
+        conversation.multipart_parts = parts
+
+        if not conversation.chunks_folder_path:
+            conversation.chunks_folder_path = upload_result['chunks_folder']
+
+        # Update received chunks
+        received_chunks = conversation.received_chunks or []
+        if chunk_number not in received_chunks:
+            received_chunks.append(chunk_number)
+            received_chunks.sort()
+            conversation.received_chunks = received_chunks
 
-    conversation.chunk_count = len(received_chunks)
-    conversation.total_duration_seconds = chunk_start_time + chunk_duration
-    conversation.save()
+        conversation.chunk_count = len(received_chunks)
+        conversation.total_duration_seconds = chunk_start_time + chunk_duration
+        conversation.save(update_fields=[
+            'multipart_parts', 'chunks_folder_path', 'received_chunks',
+            'chunk_count', 'total_duration_seconds', 'updated_at'
+        ])
 
     print(f"   Total received: {len(received_chunks)}")
 
@@ -1282,31 +1289,20 @@ def upload_chunk(request):
             conversation.title = f"Conversation - {conversation.get_duration_display()}"
 
         conversation.schedule_deletion(days=settings.CONVERSATION_RETENTION_DAYS)
-        conversation.save()
+        conversation.save(update_fields=[
+            'final_audio_url', 'is_chunks_complete', 'is_final_uploaded', 'audio_uploaded_at',
+            'ended_at', 'speakers_expected', 'title', 'updated_at'
+        ])
 
         print(f"📅 Deletion scheduled: {conversation.scheduled_deletion_date}")
         print(f"🎤 Starting final transcription")
 
-        def transcribe_with_error_handling():
-            try:
-                from .transcription import transcribe_final_audio
-                transcribe_final_audio(conversation_id)
-            except Exception as e:
-                print(f"❌ Transcription error: {e}")
-                import traceback
-                traceback.print_exc()
-                try:
-                    conv = ChunkedConversation.objects.get(id=conversation_id)
-                    conv.transcription_error = str(e)
-                    conv.save()
-                except:
-                    pass
-
-        transcription_thread = threading.Thread(
-            target=transcribe_with_error_handling,
-            daemon=True
+        async_task(
+            'chunking.tasks.final_transcription_task',
+            conversation_id,
+            timeout=FINAL_TRANSCRIPTION_TIMEOUT,
+            cluster=TRANSCRIPTION_CLUSTER
         )
-        transcription_thread.start()
 
         return JsonResponse({
             'success': True,
@@ -1342,24 +1338,14 @@ def upload_chunk(request):
 
             chunk_ids = list(untranscribed[:batch_size].values_list('id', flat=True))
 
-            def transcribe_batch():
-                try:
-                    from .transcription import transcribe_chunks_preliminary
-                    transcribe_chunks_preliminary(conversation_id, chunk_ids)
-                except Exception as e:
-                    print(f"❌ Preliminary transcription error: {e}")
-                    import traceback
-                    traceback.print_exc()
-                finally:
-                    # Clear flag when done
-                    try:
-                        conv = ChunkedConversation.objects.get(id=conversation_id)
-                        conv.is_transcribing = False
-                        conv.save()
-                    except:
-                        pass
-
-            threading.Thread(target=transcribe_batch, daemon=True).start()
+            # The task clears is_transcribing when it finishes
+            async_task(
+                'chunking.tasks.preliminary_transcription_task',
+                conversation_id,
+                chunk_ids,
+                timeout=PRELIMINARY_TRANSCRIPTION_TIMEOUT,
+                cluster=TRANSCRIPTION_CLUSTER
+            )
 
     return JsonResponse({
         'success': True,
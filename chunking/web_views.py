@@ -8,7 +8,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.db.models import Q
-import json
+from collections import defaultdict
+import orjson
 
 from .models import ChunkedConversation, Speaker, TranscriptSegment
 from streaming.models import User
@@ -130,22 +131,29 @@ def conversation_detail(request, conversation_id):
         is_shared=True
     )
 
-    # Get speakers and attach stats to each speaker object
-    speakers = conversation.speakers.all()
+    # Get speakers and attach stats to each speaker object. One pass over
+    # (speaker_id, text) instead of a COUNT plus a segment fetch per speaker.
+    speakers = list(conversation.speakers.all())
+
+    segment_counts = defaultdict(int)
+    word_counts = defaultdict(int)
+    for speaker_id, text in conversation.segments.values_list('speaker_id', 'text').iterator(chunk_size=500):
+        segment_counts[speaker_id] += 1
+        word_counts[speaker_id] += len(text.split())
 
     for speaker in speakers:
-        speaker_segments = conversation.segments.filter(speaker=speaker)
-        speaker.segment_count = speaker_segments.count()
-        speaker.total_words = sum(len(s.text.split()) for s in speaker_segments)
+        speaker.segment_count = segment_counts[speaker.id]
+        speaker.total_words = word_counts[speaker.id]
 
-    # Slice segments for display
-    segments = conversation.segments.select_related('speaker').order_by('start_time')[:1000]
+    # Slice segments for display (one extra row tells us whether there are more)
+    segments = list(conversation.segments.select_related('speaker').order_by('start_time')[:1001])
+    has_more_segments = len(segments) > 1000
 
     context = {
         'conversation': conversation,
         'speakers': speakers,
-        'segments': segments,
-        'has_more_segments': conversation.segments.count() > 1000,
+        'segments': segments[:1000],
+        'has_more_segments': has_more_segments,
     }
 
     return render(request, 'chunking/conversation_detail.html', context)
@@ -263,7 +271,7 @@ def export_analysis(request, conversation_id):
 
     # Create response with JSON file
     response = HttpResponse(
-        json.dumps(analysis_data, indent=2),
+        orjson.dumps(analysis_data, option=orjson.OPT_INDENT_2),
         content_type='application/json'
     )
     filename = f"analysis_{conversation.id}_{conversation.recorded_by.username}.json"
@@ -16,7 +16,7 @@ from django.shortcuts import render
 from django.core.files.base import ContentFile
 from django.db import connection
 from django.utils import timezone
-import json
+import orjson
 import logging
 import threading
 
@@ -33,7 +33,7 @@ class CallSearchView(View):
     def post(self, request):
         """Search for calls with recordings in a 1-minute window"""
         try:
-            data = json.loads(request.body)
+            data = orjson.loads(request.body)
             datetime_str = data.get('datetime', '').strip()
 
             if not datetime_str:
@@ -65,7 +65,7 @@ class CallSearchView(View):
                 'message': f'Found {len(calls)} calls with recordings'
             })
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
         except Exception as e:
             logger.error(f"Call search error: {str(e)}")
@@ -83,7 +83,7 @@ class CallImportView(View):
     def post(self, request):
         """Process call import request"""
         try:
-            data = json.loads(request.body)
+            data = orjson.loads(request.body)
             call_id = data.get('call_id', '').strip()
             duration = data.get('duration', '')
             received_on = data.get('received_on', '')
@@ -120,7 +120,7 @@ class CallImportView(View):
                 'total_chunks': session.chunks.count()
             })
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
         except Exception as e:
             logger.error(f"Call import error: {str(e)}")
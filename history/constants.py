@@ -11,4 +11,11 @@ DEPT_TO_GROUP = {dept_id: name for name, ids in BUSINESS_UNIT_ASSOCIATIONS.items
 
 def get_group_ids(dept_id):
     group_name = DEPT_TO_GROUP.get(dept_id)
-    return BUSINESS_UNIT_ASSOCIATIONS.get(group_name, [])
\ No newline at end of file
+    return BUSINESS_UNIT_ASSOCIATIONS.get(group_name, [])
+
+# AI job documents are immutable once built, so the query endpoint caches
+# them per S3 key and repeat questions about the same job skip S3 entirely.
+AI_DOCUMENT_CACHE_TTL = 60 * 60  # 1 hour
+
+def ai_document_cache_key(s3_key):
+    return f"ai_doc:{s3_key}"
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+def deactivate_duplicate_dispatch_jobs(apps, schema_editor):
+    """Keep the newest active row per appointment/tech so the constraint can be added."""
+    DispatchJob = apps.get_model('history', 'DispatchJob')
+    seen = set()
+    for d_job in DispatchJob.objects.filter(active=True).order_by('-id'):
+        key = (d_job.appointment_id, d_job.tech_id)
+        if key in seen:
+            DispatchJob.objects.filter(pk=d_job.pk).update(active=False)
+        else:
+            seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('history', '0010_servicetitancallsession_callanalysis_callaudiochunk'),
+    ]
+
+    operations = [
+        migrations.RunPython(deactivate_duplicate_dispatch_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dispatchjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('active', True)), fields=('appointment_id', 'tech_id'), name='unique_active_dispatch_job'),
+        ),
+    ]
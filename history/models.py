@@ -59,6 +59,17 @@ class DispatchJob(models.Model):
     ai_document_built = models.BooleanField(default=False, help_text="AI document has been built and uploaded to S3")
     out_of_order = models.BooleanField(default=False, help_text="Appointment returned to 'Scheduled' status after Dispatch")
 
+    class Meta:
+        constraints = [
+            # Near-simultaneous ST webhooks for the same appointment must not
+            # produce two active rows (and two AI document builds).
+            models.UniqueConstraint(
+                fields=['appointment_id', 'tech_id'],
+                condition=models.Q(active=True),
+                name='unique_active_dispatch_job',
+            ),
+        ]
+
     def __str__(self):
         return (f"{self.job_id} - {self.appointment_id} {'Polling...' if self.polling_active else ''} "
                 f"{TECHS[self.tech_id] if self.tech_id in TECHS else ''} {'DOC' if self.ai_document_built else ''}")
@@ -70,38 +70,50 @@ async def send_tech_status_push_async(device_tokens, new_status, appointment_id,
     if data:
         payload["data"] = data
 
-    bad_tokens = []
+    # Send to all devices concurrently; aioapns multiplexes the requests as
+    # HTTP/2 streams over the client's connection instead of one round trip each
+    results = await asyncio.gather(
+        *(_send_to_device(client, token, payload, new_status) for token in device_tokens)
+    )
+    bad_tokens = [token for token in results if token]
+
+    # await client.close()
+    return bad_tokens
+
 
-    # Send to all devices
-    for token in device_tokens:
-        try:
-            request = NotificationRequest(
-                device_token=token,
-                message=payload,
-            )
+async def _send_to_device(client, token, payload, new_status):
+    """
+    Send one notification. Returns the token if APNs rejected it as invalid
+    (so it can be deleted), otherwise None.
+    """
+    try:
+        request = NotificationRequest(
+            device_token=token,
+            message=payload,
+        )
 
-            response = await client.send_notification(request)
+        response = await client.send_notification(request)
 
-            # Check if the notification was successful
-            if response.is_successful:
-                logger.info(f"✅ Sent tech status {new_status} to device: {token[:10]}...")
-            else:
-                logger.error(f"❌ Failed to send to {token[:10]}: {response.description} (status: {response.status})")
+        # Check if the notification was successful
+        if response.is_successful:
+            logger.info(f"✅ Sent tech status {new_status} to device: {token[:10]}...")
+        else:
+            logger.error(f"❌ Failed to send to {token[:10]}: {response.description} (status: {response.status})")
 
-                # Mark bad tokens for deletion (410 = Unregistered, 400 = BadDeviceToken)
-                if response.status in [400, 410]:
-                    bad_tokens.append(token)
-                    logger.warning(f"🗑️ Marking invalid device token for removal: {token[:10]}...")
+            # Mark bad tokens for deletion (410 = Unregistered, 400 = BadDeviceToken)
+            if response.status in [400, 410]:
+                logger.warning(f"🗑️ Marking invalid device token for removal: {token[:10]}...")
+                return token
 
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"❌ Exception sending to {token[:10]}: {e}")
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"❌ Exception sending to {token[:10]}: {e}")
 
-            if "BadDeviceToken" in error_msg or "Unregistered" in error_msg:
-                bad_tokens.append(token)
+        if "BadDeviceToken" in error_msg or "Unregistered" in error_msg:
+            return token
+
+    return None
 
-    # await client.close()
-    return bad_tokens
 
 def send_push_task(user_id, new_status, appointment_id, data=None, audible=False):
     """
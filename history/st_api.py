@@ -4,20 +4,18 @@ import requests
 from datetime import datetime, timedelta
 import pytz
 from requests.structures import CaseInsensitiveDict
-import json
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 def get_access_token():
-    tokens = AccessToken.objects.all()
-    if len(tokens) > 0:
-        token = tokens[0].token
-        when = tokens[0].when
-        diff = (datetime.now(pytz.utc) - when).total_seconds()
+    cached = AccessToken.objects.first()
+    if cached is not None:
+        diff = (datetime.now(pytz.utc) - cached.when).total_seconds()
         if diff < 840:
-            return token
+            return cached.token
     print("Need new token...")
     url = "https://auth.servicetitan.io/connect/token"
     headers = CaseInsensitiveDict()
@@ -26,7 +24,7 @@ def get_access_token():
     try:
         resp = requests.post(url, headers=headers, data=data)
         if resp.status_code > 299:
-            print(resp.text)
+            logger.warning("ServiceTitan API error %s: %s", resp.status_code, resp.text)
     except Exception as E:
         print("Error getting Access Token:")
         print(E)
@@ -36,8 +34,7 @@ def get_access_token():
     try:
         access_token = myJson['access_token']
         print("New token obtained.")
-        for token in tokens:
-            token.delete()
+        AccessToken.objects.all().delete()
         AccessToken.objects.create(token=access_token,when=datetime.now(pytz.utc))
     except Exception as E:
         print("Error saving new access token:", E)
@@ -68,12 +65,11 @@ def technicians_api_call(tenant=TENANT_ID,ids=None,name=None,active=None,created
     try:
         while hasMore and (count < 100):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
             if int(resp.status_code) > 299:
-                print(resp.text)
-            response = json.loads(resp.text)
+                logger.warning("ServiceTitan API error %s: %s", resp.status_code, resp.text)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -119,12 +115,11 @@ def invoices_api_call(tenant=TENANT_ID,ids=None,statuses=None,jobId=None,jobNumb
     try:
         while hasMore and (count < 100):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
             if int(resp.status_code) > 299:
-                print(resp.text)
-            response = json.loads(resp.text)
+                logger.warning("ServiceTitan API error %s: %s", resp.status_code, resp.text)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -168,12 +163,11 @@ def jobs_api_call(tenant=TENANT_ID,ids=None,number=None,projectId=None,jobStatus
     try:
         while hasMore and (count < 10):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
             if int(resp.status_code) > 299:
-                print(resp.text)
-            response = json.loads(resp.text)
+                logger.warning("ServiceTitan API error %s: %s", resp.status_code, resp.text)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -206,10 +200,9 @@ def appointment_assignments_api_call(tenant=TENANT_ID,ids=None,appointmentIds=No
     try:
         while hasMore and (count < 10):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
-            response = json.loads(resp.text)
+            logger.debug("GET %s -> %s", url, resp.status_code)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -245,13 +238,12 @@ def customers_api_call(tenant=TENANT_ID,ids=None,createdBefore=None,createdOnOrA
     try:
         while hasMore and (count < 100):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
             if int(resp.status_code) > 299:
-                print(resp.text)
+                logger.warning("ServiceTitan API error %s: %s", resp.status_code, resp.text)
                 quit()
-            response = json.loads(resp.text)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -287,13 +279,12 @@ def locations_api_call(tenant=TENANT_ID,ids=None,createdBefore=None,createdOnOrA
     try:
         while hasMore and (count < 100):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
+            logger.debug("GET %s -> %s", url, resp.status_code)
             if int(resp.status_code) > 299:
-                print(resp.text)
+                logger.warning("ServiceTitan API error %s: %s", resp.status_code, resp.text)
                 quit()
-            response = json.loads(resp.text)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -328,10 +319,9 @@ def estimates_api_call(tenant=TENANT_ID,ids=None,status=None,jobId=None,projectI
     try:
         while hasMore and (count < 30):
             url = baseurl + f"&page={page}"
-            print(url)
             resp = requests.get(url, headers=headers)
-            print(resp.status_code)
-            response = json.loads(resp.text)
+            logger.debug("GET %s -> %s", url, resp.status_code)
+            response = orjson.loads(resp.content)
             hasMore = response["hasMore"]
             for datadict in response["data"]:
                 data.append(datadict)
@@ -7,23 +7,35 @@ from django_q.models import Task
 from datetime import timedelta
 from history.push_notifications import send_tech_status_push
 from history.st_api import invoices_api_call
-from chunking.s3_handler_hybrid import get_s3_client, generate_presigned_download_url
-import json
+from chunking.s3_handler_hybrid import generate_presigned_download_url
+from streaming_transcriber.clients import get_s3_client
+from history.constants import AI_DOCUMENT_CACHE_TTL, ai_document_cache_key
+from django.core.cache import cache
+import orjson
+import logging
 import tiktoken
 
+logger = logging.getLogger(__name__)
+
 
 def pollA():
     try:
         #print("pollA...")
         dispatch_jobs = DispatchJob.objects.filter(active=True)
+        # One query per pass for every active tech (and their user), instead of
+        # a profile lookup per job plus a full profile scan per job
+        profiles = {
+            str(p.st_id): p for p in UserProfile.objects.filter(active=True).select_related('user')
+        }
+        techusers = set(profiles)
         for d_job in dispatch_jobs:
             # Get user for push notifications
-            try:
-                user_profile = UserProfile.objects.get(st_id=d_job.tech_id, active=True)
+            user_profile = profiles.get(d_job.tech_id)
+            if user_profile:
                 user = user_profile.user
-            except UserProfile.DoesNotExist:
+            else:
                 d_job.active = False # Can't send notifications; user on their own
-                d_job.save()
+                d_job.save(update_fields=['active', 'last_updated'])
                 user = None
                 continue
             jobs = jobs_api_call(ids=d_job.job_id)
@@ -40,7 +52,10 @@ def pollA():
                 d_job.notified_done = False
                 d_job.notified_working = False
                 d_job.active = False
-                d_job.save()
+                d_job.save(update_fields=[
+                    'polling_active', 'notified_history', 'notified_done',
+                    'notified_working', 'active', 'last_updated'
+                ])
                 continue
             appointment_assignments = appointment_assignments_api_call(appointmentIds=d_job.appointment_id)
             if len(appointment_assignments) == 0 or appointment_assignments[0]['status'] in ["Done","Scheduled"]:
@@ -55,13 +70,14 @@ def pollA():
                 d_job.notified_done = False
                 d_job.notified_working = False
                 d_job.active = False
-                d_job.save()
+                d_job.save(update_fields=[
+                    'polling_active', 'notified_history', 'notified_done',
+                    'notified_working', 'active', 'last_updated'
+                ])
                 continue
             #
             #   Find tech's data in list, if it is there
             #
-            techusers = [str(o.st_id) for o in UserProfile.objects.filter(active=True)]
-
             for assignment in appointment_assignments:
                 if str(assignment["technicianId"]) not in techusers:
                     # This would be a ride-along or helper
@@ -74,32 +90,32 @@ def pollA():
 
                 if assignment["status"] == "Dispatched":
                     #
-                    #   Ensure ST polling for "Working" starts
+                    #   Ensure ST polling for "Working" starts (only write when it actually changes)
                     #
-                    d_job.polling_active = True
-                    d_job.save()
+                    if not d_job.polling_active:
+                        d_job.polling_active = True
+                        d_job.save(update_fields=['polling_active', 'last_updated'])
 
                     # Check if history is ready and send push if not already notified
                     if not d_job.notified_history and user and d_job.ai_document_built:
                         send_tech_status_push(user, 3, appointment_id=d_job.appointment_id,audible=True)
-                        d_job.save()
-                        print(f"Sent history ready push (result:3) for job {d_job.job_id}")
+                        logger.info("Sent history ready push (result:3) for job %s", d_job.job_id)
 
                 elif assignment["status"] == "Working":
-                    print(f"Setting DispatchJob status to 'Working' for job {d_job.job_id}")
-                    d_job.status = "Working"  # THIS IS WHAT TRIGGERS RECORDING START; don't set active to False
+                    if d_job.status != "Working":
+                        logger.info("Setting DispatchJob status to 'Working' for job %s", d_job.job_id)
+                        d_job.status = "Working"  # THIS IS WHAT TRIGGERS RECORDING START; don't set active to False
+                        d_job.save(update_fields=['status', 'last_updated'])
                     #d_job.polling_active = True  # Should already be True; iOS polling will set to False when recording starts
                     # Send push notification if not already sent
                     if not d_job.notified_working and user and DeviceToken.objects.filter(user=user).exists():
 
                         send_tech_status_push(user, 1, appointment_id=d_job.appointment_id,audible=True)
                         #print(f"Sent working push (result:1) for job {d_job.job_id}")
-
-                    d_job.save()
                 else:
-                    print(f"Assignment error!  status = {assignment['status']}!!")
+                    logger.error("Assignment error!  status = %s!!", assignment['status'])
     except Exception as e:
-        print(f"PollA failed: {e}")
+        logger.error("PollA failed: %s", e)
 
 
 
@@ -113,7 +129,7 @@ def build_ai_job_document(dispatch_job_id, customer_id, location_id):
         #job = jobs_api_call(ids=dispatch_job.job_id)[0]
         #customer_id = job["customerId"]
 
-        print(f"Building AI document for job {dispatch_job.job_id}...")
+        logger.info("Building AI document for job %s...", dispatch_job.job_id)
 
         # Construct the document with these
         document_content = construct_job_document(
@@ -134,9 +150,17 @@ def build_ai_job_document(dispatch_job_id, customer_id, location_id):
         # Store the S3 key (not URL - we'll generate presigned URLs when needed)
         dispatch_job.ai_document_s3_key = s3_key
         dispatch_job.ai_document_built = True
-        dispatch_job.save()
+        dispatch_job.save(update_fields=['ai_document_s3_key', 'ai_document_built', 'last_updated'])
+
+        # Warm the query endpoint's cache so the tech's first question
+        # doesn't have to fetch the document back from S3. Best effort: the
+        # document is already in S3, so a cache outage mustn't stop the push.
+        try:
+            cache.set(ai_document_cache_key(s3_key), document_content, AI_DOCUMENT_CACHE_TTL)
+        except Exception:
+            logger.warning("Could not warm AI document cache for %s", s3_key, exc_info=True)
 
-        print(f"✅ AI document built and uploaded: {s3_key}")
+        logger.info("✅ AI document built and uploaded: %s", s3_key)
 
         # Send push notification to user that document is ready
         try:
@@ -146,17 +170,17 @@ def build_ai_job_document(dispatch_job_id, customer_id, location_id):
             # Send notification - reusing result:3 (or we can create result:4 for AI doc ready)
             send_tech_status_push(user, 3, appointment_id=dispatch_job.appointment_id,audible=True)
             dispatch_job.notified_history = True  # Reusing this flag
-            dispatch_job.save()
-            print(f"📱 Sent AI document ready notification (result:3) for job {dispatch_job.job_id} appointment {dispatch_job.appointment_id}")
+            dispatch_job.save(update_fields=['notified_history', 'last_updated'])
+            logger.info("📱 Sent AI document ready notification (result:3) for job %s appointment %s", dispatch_job.job_id, dispatch_job.appointment_id)
         except UserProfile.DoesNotExist:
-            print(f"⚠️ No user profile found for tech_id {dispatch_job.tech_id}")
+            logger.warning("⚠️ No user profile found for tech_id %s", dispatch_job.tech_id)
 
 
 
     except DispatchJob.DoesNotExist:
-        print(f"❌ DispatchJob {dispatch_job_id} not found")
+        logger.error("❌ DispatchJob %s not found", dispatch_job_id)
     except Exception as e:
-        print(f"❌ Error building AI document: {e}")
+        logger.error("❌ Error building AI document: %s", e)
 
 
 def construct_job_document(customer_id, location_id, job_id=None, appointment_id=None, tech_id=None):
@@ -169,11 +193,11 @@ def construct_job_document(customer_id, location_id, job_id=None, appointment_id
     myjson = get_invoices(customer_id, location_id, myjson)
     myjson = get_estimates(location_id, myjson)
 
-    mydoc = json.dumps(myjson)
+    mydoc = orjson.dumps(myjson).decode()
     enc = tiktoken.encoding_for_model("gpt-4-turbo")
-    tokens = len(enc.encode(str(mydoc)))
-    print(f"Tokens: {tokens}")
-    return json.dumps(myjson)
+    tokens = len(enc.encode(mydoc))
+    logger.debug("Tokens: %s", tokens)
+    return mydoc
 
 
 def upload_document_to_s3(document_content, job_id, appointment_id):
@@ -197,7 +221,7 @@ def upload_document_to_s3(document_content, job_id, appointment_id):
 
 def get_invoices(customer_id, location_id, myjson):
     try:
-        print(f"Getting invoices for customer {customer_id}")
+        logger.debug("Getting invoices for customer %s", customer_id)
         one_year_ago = timezone.now() - timedelta(days=int(settings.HISTORY_MONTHS) * 30)
         formatted_date = one_year_ago.strftime("%Y-%m-%d")
         invoices = invoices_api_call(invoicedOnOrAfter=formatted_date, customerId=customer_id)
@@ -209,7 +233,7 @@ def get_invoices(customer_id, location_id, myjson):
                 continue
             try:
                 if str(invoice["location"]["id"]) != str(location_id):
-                    print(f"API Invoice location ID {str(invoice['location']['id'])} != {str(location_id)}")
+                    logger.debug("API Invoice location ID %s != %s", invoice['location']['id'], location_id)
                     continue
             except:
                 pass
@@ -227,7 +251,7 @@ def get_invoices(customer_id, location_id, myjson):
                             )
             myjson['invoices'].append(inv)
     except Exception as e:
-        print(f"Error fetching invoices: {e}")
+        logger.error("Error fetching invoices: %s", e)
     return myjson
 
 def get_customer_info(customer_id, location_id, myjson):
@@ -264,7 +288,7 @@ def get_customer_info(customer_id, location_id, myjson):
             "In many cases, the owner and occupant are the same person."
         )
     except Exception as e:
-        print(f"Error fetching customer data: {e}")
+        logger.error("Error fetching customer data: %s", e)
     return myjson
 
 def get_estimates(location_id, myjson):
@@ -283,5 +307,5 @@ def get_estimates(location_id, myjson):
                 myjson["estimates"].append(est)
 
     except Exception as e:
-        print(f"Error fetching estimates: {e}")
+        logger.error("Error fetching estimates: %s", e)
     return myjson
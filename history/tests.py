@@ -1,3 +1,60 @@
+"""
+Tests for history app.
+
+These tests mock S3 and OpenAI so they never hit the network and don't
+require real credentials.
+"""
+from io import BytesIO
+from unittest.mock import patch, MagicMock
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from history import views
+
+
+class FetchDocumentFromS3Tests(TestCase):
+    """AI job documents are immutable once built, so repeat fetches are cached."""
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    @patch("history.views.get_s3_client")
+    def test_second_fetch_for_same_key_skips_s3(self, mock_s3_factory):
+        s3_client = MagicMock()
+        s3_client.get_object.return_value = {"Body": BytesIO(b'{"billing_name": "Pat"}')}
+        mock_s3_factory.return_value = s3_client
+
+        first = views.fetch_document_from_s3("ai_documents/job_1_appt_2.txt")
+        second = views.fetch_document_from_s3("ai_documents/job_1_appt_2.txt")
+
+        self.assertEqual(first, '{"billing_name": "Pat"}')
+        self.assertEqual(second, first)
+        self.assertEqual(s3_client.get_object.call_count, 1)
+
+    @patch("history.views.get_s3_client")
+    def test_failed_fetch_is_not_cached(self, mock_s3_factory):
+        s3_client = MagicMock()
+        s3_client.get_object.side_effect = Exception("NoSuchKey")
+        mock_s3_factory.return_value = s3_client
+
+        self.assertIsNone(views.fetch_document_from_s3("ai_documents/job_1_appt_2.txt"))
+        self.assertIsNone(views.fetch_document_from_s3("ai_documents/job_1_appt_2.txt"))
+        self.assertEqual(s3_client.get_object.call_count, 2)
+
+    @patch("history.views.cache")
+    @patch("history.views.get_s3_client")
+    def test_cache_outage_falls_through_to_s3(self, mock_s3_factory, mock_cache):
+        mock_cache.get.side_effect = ConnectionError("redis down")
+        mock_cache.set.side_effect = ConnectionError("redis down")
+        s3_client = MagicMock()
+        s3_client.get_object.return_value = {"Body": BytesIO(b'{"billing_name": "Pat"}')}
+        mock_s3_factory.return_value = s3_client
+
+        self.assertEqual(
+            views.fetch_document_from_s3("ai_documents/job_1_appt_2.txt"),
+            '{"billing_name": "Pat"}',
+        )
@@ -1,122 +1,145 @@
 
-import json
-from django.http import HttpResponse, JsonResponse
+import orjson
+from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from history.models import DispatchJob
 from streaming.models import AuthToken, UserProfile
 from history.models import DeviceToken
 from django.utils import timezone
+from django.db import transaction
 from django_q.tasks import async_task
 from django.conf import settings
 from datetime import datetime, timedelta
+from django.core.cache import cache
 import secrets
+import base64
+import logging
 import requests
 import os
-from chunking.s3_handler_hybrid import get_s3_client
+from streaming_transcriber.clients import get_openai_client, get_s3_client
+from streaming.auth_views import AUTH_TOKEN_BYTES, get_user_from_token, invalidate_cached_token
+from history.constants import AI_DOCUMENT_CACHE_TTL, ai_document_cache_key
+from history.push_notifications import send_tech_status_push
+
+logger = logging.getLogger(__name__)
+
+
+def _json_response(data, status=200):
+    """JsonResponse equivalent, encoded with orjson (returns bytes directly)"""
+    return HttpResponse(orjson.dumps(data), status=status, content_type='application/json')
+
 
 TOKEN_LIFETIME = timedelta(days=7)
 REFRESH_WINDOW = timedelta(hours=24)  # if less than this remaining, refresh
 
+# confirm_notification result -> (DispatchJob field values, confirmed label)
+CONFIRMATION_ACTIONS = {
+    # WORKING (Tech has arrived): stop polling ST once iOS confirms 'Working'
+    1: ((('notified_working', True), ('recording_active', True), ('polling_active', False)), 'working'),
+    # DONE (Tech has completed job)
+    2: ((('recording_stopped', True), ('polling_active', False), ('notified_done', True)), 'done'),
+    # iOS acknowledges it knows history is ready
+    3: ((('notified_history', True),), 'history'),
+}
+
 # Create your views here.
 
 
+def mark_dispatch_job_done(job_number):
+    """
+    Set a DispatchJob to 'Done' and, if iOS is recording it, push 'stop
+    recording' (result:2) right away instead of waiting for the next pollA pass.
+    """
+    dispatch_job = DispatchJob.objects.filter(job_id=str(job_number)).only(
+        'id', 'status', 'job_id', 'appointment_id', 'tech_id', 'notified_working', 'notified_done'
+    ).first()
+    if dispatch_job is None:
+        return
+    dispatch_job.status = "Done"
+    dispatch_job.save(update_fields=['status', 'last_updated'])
+
+    if dispatch_job.notified_working and not dispatch_job.notified_done:
+        try:
+            user = UserProfile.objects.get(st_id=dispatch_job.tech_id, active=True).user
+        except UserProfile.DoesNotExist:
+            return
+        send_tech_status_push(user, 2, appointment_id=dispatch_job.appointment_id)
+        logger.info("Sent done push (result:2) for job %s", dispatch_job.job_id)
+
+
 @csrf_exempt
 def job_complete(request):
     try:
-        body_unicode = request.body.decode('utf-8')
-        data = json.loads(body_unicode)
+        data = orjson.loads(request.body)
     except Exception as e:
-        print(f"Webhook data decode error: {e}")
+        logger.error("Webhook data decode error: %s", e)
         return HttpResponse(status=200)
     try:
-        print(f"Job Complete received: {data['jobNumber']}")
-        dispatch_jobs = DispatchJob.objects.filter(job_id=str(data['jobNumber']))
-        if len(dispatch_jobs) > 0:
-            dispatch_job = dispatch_jobs[0]
-            dispatch_job.status = "Done"
-            dispatch_job.save()
+        logger.info("Job Complete received: %s", data['jobNumber'])
+        mark_dispatch_job_done(data['jobNumber'])
     except Exception as e:
-        print(f"Attempting decode for Webhook V2...")
+        logger.debug("Attempting decode for Webhook V2...")
         try:
-            dispatch_jobs = DispatchJob.objects.filter(job_id=str(data['data']['job']['jobNumber']))
-            if len(dispatch_jobs) > 0:
-                dispatch_job = dispatch_jobs[0]
-                dispatch_job.status = "Done"
-                dispatch_job.save()
+            mark_dispatch_job_done(data['data']['job']['jobNumber'])
         except Exception as f:
-            print(f"Exception while decoding Webhook V2 data: {f}")
-        print(f"Exception while Completing DispatchJob: {e}")
+            logger.error("Exception while decoding Webhook V2 data: %s", f)
+        logger.error("Exception while Completing DispatchJob: %s", e)
     return HttpResponse(status=200)
 
 
 
-
-
-
-
-
-def get_user_from_token(token_string):
-    """Helper to get user from token string"""
-    try:
-        token = AuthToken.objects.get(token=token_string, is_active=True)
-        if token.expires_at < timezone.now():
-            token.is_active = False
-            token.save()
-            return None
-        return token.user
-    except AuthToken.DoesNotExist:
-        return None
-
-
 @csrf_exempt
 def register_device_token(request):
     if request.method != 'POST':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return _json_response({'error': 'Method not allowed'}, status=405)
 
     # --- Authorization header ---
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
-        return JsonResponse({'error': 'Missing or invalid Authorization header'}, status=401)
+        return _json_response({'error': 'Missing or invalid Authorization header'}, status=401)
 
-    raw_token = auth_header.split('Bearer ')[1].strip()
+    raw_token = auth_header[7:].strip()  # len('Bearer ')
 
     # --- Validate AuthToken ---
     try:
-        auth_token = AuthToken.objects.get(token=raw_token, is_active=True)
+        auth_token = AuthToken.objects.select_related('user').get(token=raw_token, is_active=True)
     except AuthToken.DoesNotExist:
-        return JsonResponse({'error': 'Invalid or inactive token'}, status=401)
+        return _json_response({'error': 'Invalid or inactive token'}, status=401)
 
     if auth_token.expires_at < timezone.now():
-        return JsonResponse({'error': 'Token expired'}, status=401)
+        return _json_response({'error': 'Token expired'}, status=401)
 
     user = auth_token.user
 
     # --- Refresh token if near expiry ---
     time_remaining = auth_token.expires_at - timezone.now()
     new_token = None
+    new_expires_at = None
     if time_remaining < REFRESH_WINDOW:
-        auth_token.is_active = False
-        auth_token.save()
-
-        new_token_str = secrets.token_hex(32)
-        new_auth_token = AuthToken.objects.create(
-            user=user,
-            token=new_token_str,
-            expires_at=timezone.now() + TOKEN_LIFETIME,
-            is_active=True,
-        )
+        # Retire the old token and issue its replacement in one transaction
+        # so the device is never left without a valid token.
+        with transaction.atomic():
+            AuthToken.objects.filter(pk=auth_token.pk).update(is_active=False)
+            new_auth_token = AuthToken.objects.create(
+                user=user,
+                token=secrets.token_urlsafe(AUTH_TOKEN_BYTES),
+                expires_at=timezone.now() + TOKEN_LIFETIME,
+                is_active=True,
+            )
+        invalidate_cached_token(raw_token)
         new_token = new_auth_token.token
+        new_expires_at = new_auth_token.expires_at
 
     # --- Parse request body ---
     try:
-        body = json.loads(request.body.decode('utf-8'))
+        body = orjson.loads(request.body)
         device_token = body.get('device_token')
         platform = body.get('platform', 'ios')
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    except orjson.JSONDecodeError:
+        return _json_response({'error': 'Invalid JSON body'}, status=400)
 
     if not device_token:
-        return JsonResponse({'error': 'Missing device_token'}, status=400)
+        return _json_response({'error': 'Missing device_token'}, status=400)
 
     # --- Save / update ---
     obj, created = DeviceToken.objects.update_or_create(
@@ -136,9 +159,9 @@ def register_device_token(request):
 
     if new_token:
         response['new_token'] = new_token
-        response['expires_at'] = (timezone.now() + TOKEN_LIFETIME).isoformat()
+        response['expires_at'] = new_expires_at.isoformat()
 
-    return JsonResponse(response, status=200)
+    return _json_response(response, status=200)
 
 
 @csrf_exempt
@@ -149,67 +172,54 @@ def confirm_notification(request):
     result: 1=Working, 2=Done, 3=History Ready
     """
     if request.method != 'POST':
-        return JsonResponse({'error': 'Method not allowed'}, status=405)
+        return _json_response({'error': 'Method not allowed'}, status=405)
 
     # Get token from header
     auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
-        return JsonResponse({'error': 'Invalid authorization header'}, status=401)
+        return _json_response({'error': 'Invalid authorization header'}, status=401)
 
-    token = auth_header.split(' ')[1]
+    token = auth_header[7:].strip()  # len('Bearer ')
     user = get_user_from_token(token)
 
     if not user:
-        return JsonResponse({'error': 'Invalid token'}, status=401)
+        return _json_response({'error': 'Invalid token'}, status=401)
 
     # Parse request body
     try:
-        body = json.loads(request.body.decode('utf-8'))
+        body = orjson.loads(request.body)
         appointment_id = body.get('appointment_id')
         result = body.get('result')
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    except orjson.JSONDecodeError:
+        return _json_response({'error': 'Invalid JSON body'}, status=400)
 
     if not appointment_id or result not in [1, 2, 3]:
-        return JsonResponse({'error': 'Missing or invalid job_id or result'}, status=400)
+        return _json_response({'error': 'Missing or invalid job_id or result'}, status=400)
 
     # Get user's tech_id
     try:
-        user_profile = UserProfile.objects.get(user=user)
+        user_profile = user.profile  # joined in by get_user_from_token
         tech_id = user_profile.st_id
     except UserProfile.DoesNotExist:
-        return JsonResponse({'error': 'User profile not found'}, status=404)
+        return _json_response({'error': 'User profile not found'}, status=404)
 
     # Find the DispatchJob
     try:
         dispatch_job = DispatchJob.objects.get(appointment_id=str(appointment_id), tech_id=tech_id, active=True)
     except DispatchJob.DoesNotExist:
-        return JsonResponse({'error': 'Job not found'}, status=404)
-
-    print(f"Job {dispatch_job.job_id} result: {result} type: {type(result)}")
-
-    # Update the appropriate confirmation field
-    if result == 1: # WORKING (Tech has arrived)
-        dispatch_job.notified_working = True
-        dispatch_job.recording_active = True # Redundant
-        dispatch_job.polling_active = False  # Stop polling ST once iOS confirms 'Working'
-        dispatch_job.save()
-        return JsonResponse({'status': 'success', 'confirmed': 'working'}, status=200)
+        return _json_response({'error': 'Job not found'}, status=404)
 
-    elif result == 2:  # DONE (Tech has completed job)
-        dispatch_job.recording_stopped = True
-        dispatch_job.polling_active = False
-        dispatch_job.notified_done = True
-        dispatch_job.save()
-        return JsonResponse({'status': 'success', 'confirmed': 'done'}, status=200)
+    logger.debug("Job %s result: %s type: %s", dispatch_job.job_id, result, type(result))
 
-    elif result == 3:
-        # iOS acknowledges it knows history is ready
-        dispatch_job.notified_history = True
-        dispatch_job.save()
-        return JsonResponse({'status': 'success', 'confirmed': 'history'}, status=200)
-
-    return JsonResponse({'error': 'Unknown error'}, status=500)
+    # Update the appropriate confirmation fields. iOS retries confirmations, so
+    # skip the UPDATE when the row already records the acknowledgement.
+    updates, confirmed = CONFIRMATION_ACTIONS[result]
+    changed = [field for field, value in updates if getattr(dispatch_job, field) != value]
+    if changed:
+        for field, value in updates:
+            setattr(dispatch_job, field, value)
+        dispatch_job.save(update_fields=changed + ['last_updated'])
+    return _json_response({'status': 'success', 'confirmed': confirmed}, status=200)
 
 
 @csrf_exempt
@@ -223,50 +233,52 @@ def ai_conversation_query(request):
     }
     """
     if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+        return _json_response({'success': False, 'error': 'Method not allowed'}, status=405)
 
     # Get token from header
     auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
-        return JsonResponse({'success': False, 'error': 'Invalid authorization header'}, status=401)
+        return _json_response({'success': False, 'error': 'Invalid authorization header'}, status=401)
 
-    token = auth_header.split(' ')[1]
+    token = auth_header[7:].strip()  # len('Bearer ')
     user = get_user_from_token(token)
 
     if not user:
-        return JsonResponse({'success': False, 'error': 'Invalid token'}, status=401)
+        return _json_response({'success': False, 'error': 'Invalid token'}, status=401)
 
     # Parse request body
     try:
-        body = json.loads(request.body.decode('utf-8'))
+        body = orjson.loads(request.body)
         query = body.get('query')
         appointment_id = body.get('appointment_id', '')  # Reserved for future use
         conversation_history = body.get('conversation_history', [])
         voice = body.get('voice', 'alloy')
         speed = body.get('speed', 1.0)
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        return JsonResponse({'success': False, 'error': 'Invalid JSON body'}, status=400)
+    except orjson.JSONDecodeError:
+        return _json_response({'success': False, 'error': 'Invalid JSON body'}, status=400)
 
     if not query or not appointment_id:
-        return JsonResponse({'success': False, 'error': 'Missing required fields'}, status=400)
+        return _json_response({'success': False, 'error': 'Missing required fields'}, status=400)
 
     # Get user's current active job
     try:
-        user_profile = UserProfile.objects.get(user=user)
+        user_profile = user.profile  # joined in by get_user_from_token
         tech_id = user_profile.st_id
 
         # Get the active dispatch job for this tech
-        dispatch_job = DispatchJob.objects.filter(tech_id=tech_id, appointment_id=appointment_id).first()
+        dispatch_job = DispatchJob.objects.filter(tech_id=tech_id, appointment_id=appointment_id).only(
+            'ai_document_built', 'ai_document_s3_key'
+        ).first()
 
         if not dispatch_job:
-            return JsonResponse({
+            return _json_response({
                 'success': False,
                 'error': 'No active job found'
             }, status=404)
 
         # Check if AI document is ready
         if not dispatch_job.ai_document_built or not dispatch_job.ai_document_s3_key:
-            return JsonResponse({
+            return _json_response({
                 'success': False,
                 'error': 'Job document not ready yet. Please try again in a moment.'
             }, status=202)  # 202 Accepted - processing
@@ -275,7 +287,7 @@ def ai_conversation_query(request):
         job_document = fetch_document_from_s3(dispatch_job.ai_document_s3_key)
 
         if not job_document:
-            return JsonResponse({
+            return _json_response({
                 'success': False,
                 'error': 'Unable to retrieve job document'
             }, status=500)
@@ -289,7 +301,7 @@ def ai_conversation_query(request):
 
         answer = ai_response['answer']
 
-        print(f"AI Answer generated!")
+        logger.info("AI Answer generated!")
 
         # Generate TTS audio for the answer
         try:
@@ -307,14 +319,14 @@ def ai_conversation_query(request):
                 "response_format": "mp3"
             }
 
-            print(f"🔊 Generating TTS: voice={voice}, speed={speed}")
+            logger.info("🔊 Generating TTS: voice=%s, speed=%s", voice, speed)
 
             tts_response = requests.post(openai_tts_url, headers=tts_headers, json=tts_payload)
 
             if tts_response.status_code != 200:
-                print(f"⚠️ TTS generation failed: {tts_response.status_code}")
+                logger.warning("⚠️ TTS generation failed: %s", tts_response.status_code)
                 # Return answer without audio
-                return JsonResponse({
+                return _json_response({
                     'success': True,
                     'answer': answer,
                     'audio': None,
@@ -322,13 +334,12 @@ def ai_conversation_query(request):
                 })
 
             # Encode audio as base64
-            import base64
             audio_base64 = base64.b64encode(tts_response.content).decode('utf-8')
 
-            print(f"✅ TTS generated: {len(tts_response.content)} bytes")
+            logger.info("✅ TTS generated: %s bytes", len(tts_response.content))
 
             # Return both text and audio
-            return JsonResponse({
+            return _json_response({
                 'success': True,
                 'answer': answer,
                 'audio': audio_base64,
@@ -336,55 +347,80 @@ def ai_conversation_query(request):
             })
 
         except Exception as tts_error:
-            print(f"❌ TTS error: {str(tts_error)}")
+            logger.error("❌ TTS error: %s", tts_error)
             # Return answer without audio if TTS fails
-            return JsonResponse({
+            return _json_response({
                 'success': True,
                 'answer': answer,
                 'audio': None,
                 'error': f'TTS error: {str(tts_error)}'
             })
 
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    except orjson.JSONDecodeError:
+        return _json_response({'success': False, 'error': 'Invalid JSON'}, status=400)
     except Exception as e:
-        print(f"❌ Query error: {str(e)}")
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+        logger.error("❌ Query error: %s", e)
+        return _json_response({'success': False, 'error': str(e)}, status=500)
 ################################################################################
 
 
 def fetch_document_from_s3(s3_key):
     """
-    Fetch document content from S3 using presigned URL
+    Fetch document content from S3
+
+    Documents never change once built, so they're cached per S3 key; only
+    the first question about a job pays for the S3 round trip.
     """
+    cache_key = ai_document_cache_key(s3_key)
+    # The cache is only a shortcut: if it's unreachable, fall through to S3
     try:
-        s3_client = get_s3_client()
+        job_document = cache.get(cache_key)
+    except Exception:
+        logger.warning("AI document cache read failed for %s", s3_key, exc_info=True)
+        job_document = None
+    if job_document is not None:
+        return job_document
 
-        # Generate presigned download URL (1 hour expiration)
-        presigned_url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                'Key': s3_key
-            },
-            ExpiresIn=3600
+    try:
+        # Read through the shared boto3 client (pooled connection, botocore's
+        # own retries) rather than a presigned URL plus a second HTTPS request
+        s3_client = get_s3_client()
+        obj = s3_client.get_object(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Key=s3_key
         )
-
-        # Download the document
-        response = requests.get(presigned_url)
-
-        if response.status_code == 200:
-            return response.text
-        else:
-            print(f"❌ Failed to fetch document from S3: {response.status_code}")
-            return None
-
-    except Exception as e:
-        print(f"❌ Error fetching document from S3: {e}")
-        import traceback
-        traceback.print_exc()
+        job_document = obj['Body'].read().decode('utf-8')
+    except Exception:
+        logger.exception("❌ Error fetching document from S3")
         return None
 
+    try:
+        cache.set(cache_key, job_document, AI_DOCUMENT_CACHE_TTL)
+    except Exception:
+        logger.warning("AI document cache write failed for %s", s3_key, exc_info=True)
+    return job_document
+
+
+# Static instructions go first in every request so OpenAI's automatic prompt
+# caching can reuse the prefix across turns; only the tail (history + the
+# new question) varies.
+VOICE_ASSISTANT_SYSTEM_PROMPT = (
+    "You are Charisse (pronounced 'shuhreese'), a helpful voice assistant for field service technicians. "
+    "You communicate through speech, so keep your responses conversational and natural for voice interaction. "
+    "You have access to job and customer information. "
+    "Provide accurate, concise, and helpful answers. "
+    "If information is not available in the job data, say so politely. "
+    "Keep responses brief and actionable - the technician is likely driving or preparing for the job. "
+    "Maintain a clean and professional tone at all times. "
+    "If the user uses profanity or vulgar language, ignore it and respond professionally without acknowledging the inappropriate language. "
+    "\n"
+    "CRITICAL: When providing numbers (addresses, phone numbers, zip codes, etc.), accuracy is imperative. "
+    "Read numbers exactly as they appear - for example, 20115 is 'twenty thousand one hundred fifteen' or 'two zero one one five', NOT 'two thousand fifteen'. "
+    "Double-check all numeric information before responding. "
+    "\n"
+    "When providing addresses, include the street address and city, but OMIT the zip code unless specifically requested."
+)
+
 
 def query_ai_service(job_document, user_query, conversation_history=None):
     """
@@ -396,32 +432,18 @@ def query_ai_service(job_document, user_query, conversation_history=None):
         'tokens_used': int
     }
     """
-    from openai import OpenAI
-
-    # max_retries=3 enables SDK-level retry-with-backoff for transient errors;
-    # important here because Charisse runs in-vehicle on flaky cellular.
-    client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=3)
+    # Shared per-process client (configured with max_retries=3 for SDK-level
+    # retry-with-backoff; important here because Charisse runs in-vehicle on
+    # flaky cellular). Reusing it keeps the connection to OpenAI warm.
+    client = get_openai_client()
+    if client is None:
+        raise ValueError("OpenAI API key not configured")
 
     # Build messages for the conversation
     messages = [
         {
             "role": "system",
-            "content": (
-                "You are Charisse (pronounced 'shuhreese'), a helpful voice assistant for field service technicians. "
-                "You communicate through speech, so keep your responses conversational and natural for voice interaction. "
-                "You have access to job and customer information. "
-                "Provide accurate, concise, and helpful answers. "
-                "If information is not available in the job data, say so politely. "
-                "Keep responses brief and actionable - the technician is likely driving or preparing for the job. "
-                "Maintain a clean and professional tone at all times. "
-                "If the user uses profanity or vulgar language, ignore it and respond professionally without acknowledging the inappropriate language. "
-                "\n"
-                "CRITICAL: When providing numbers (addresses, phone numbers, zip codes, etc.), accuracy is imperative. "
-                "Read numbers exactly as they appear - for example, 20115 is 'twenty thousand one hundred fifteen' or 'two zero one one five', NOT 'two thousand fifteen'. "
-                "Double-check all numeric information before responding. "
-                "\n"
-                "When providing addresses, include the street address and city, but OMIT the zip code unless specifically requested."
-            )
+            "content": VOICE_ASSISTANT_SYSTEM_PROMPT
         },
         {
             "role": "system",
@@ -444,7 +466,9 @@ def query_ai_service(job_document, user_query, conversation_history=None):
         model=settings.OPENAI_VOICE_ASSISTANT_MODEL,
         messages=messages,
         temperature=0.7,
-        max_tokens=500
+        # Answers are spoken aloud and meant to be brief; a tighter cap
+        # keeps latency down when the model gets wordy.
+        max_tokens=300
     )
 
     return {
@@ -464,28 +488,28 @@ def text_to_speech_view(request):
     }
     """
     if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+        return _json_response({'success': False, 'error': 'Method not allowed'}, status=405)
 
     # Get token from header
     auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
-        return JsonResponse({'success': False, 'error': 'Invalid authorization header'}, status=401)
+        return _json_response({'success': False, 'error': 'Invalid authorization header'}, status=401)
 
-    token = auth_header.split(' ')[1]
+    token = auth_header[7:].strip()  # len('Bearer ')
     user = get_user_from_token(token)
 
     if not user:
-        return JsonResponse({'success': False, 'error': 'Invalid token'}, status=401)
+        return _json_response({'success': False, 'error': 'Invalid token'}, status=401)
 
     # Parse request body
     try:
-        body = json.loads(request.body.decode('utf-8'))
+        body = orjson.loads(request.body)
         text = body.get('text')
         voice = body.get('voice', 'alloy')
         speed = body.get('speed', 1.0)
 
         if not text:
-            return JsonResponse({'success': False, 'error': 'No text provided'}, status=400)
+            return _json_response({'success': False, 'error': 'No text provided'}, status=400)
 
         # Call OpenAI TTS API
         openai_url = "https://api.openai.com/v1/audio/speech"
@@ -502,19 +526,19 @@ def text_to_speech_view(request):
             "response_format": "mp3"
         }
 
-        print(f"🔊 TTS Request from {user.username}: voice={voice}, speed={speed}, text_length={len(text)}")
+        logger.info("🔊 TTS Request from %s: voice=%s, speed=%s, text_length=%s", user.username, voice, speed, len(text))
 
         response = requests.post(openai_url, headers=headers, json=payload)
 
         if response.status_code != 200:
             error_text = response.text[:200]
-            print(f"❌ OpenAI TTS error {response.status_code}: {error_text}")
-            return JsonResponse(
+            logger.error("❌ OpenAI TTS error %s: %s", response.status_code, error_text)
+            return _json_response(
                 {'success': False, 'error': f'OpenAI API error: {response.status_code}'},
                 status=response.status_code
             )
 
-        print(f"✅ TTS Success: {len(response.content)} bytes")
+        logger.info("✅ TTS Success: %s bytes", len(response.content))
 
         # Return audio data directly
         return HttpResponse(
@@ -523,11 +547,11 @@ def text_to_speech_view(request):
             status=200
         )
 
-    except json.JSONDecodeError:
-        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    except orjson.JSONDecodeError:
+        return _json_response({'success': False, 'error': 'Invalid JSON'}, status=400)
     except Exception as e:
-        print(f"❌ TTS error: {str(e)}")
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+        logger.error("❌ TTS error: %s", e)
+        return _json_response({'success': False, 'error': str(e)}, status=500)
 
 
 
@@ -542,8 +566,11 @@ def text_to_speech_view(request):
 
 @csrf_exempt
 def testing(request):
+    # Manual trigger for the document builder; not exposed in production
+    if not settings.DEBUG:
+        return HttpResponse(status=404)
     dispatchJob_job_id = "402956116"
-    print("Testing!")
+    logger.debug("Testing!")
     dispatch_job = DispatchJob.objects.get(job_id=dispatchJob_job_id)
     dispatch_job_id = dispatch_job.id
     async_task('history.tasks.build_ai_job_document', dispatch_job_id)
@@ -4,15 +4,23 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.contrib.auth.models import User
 from django.utils import timezone
+from django.core.cache import cache
+from django.contrib.auth.models import User
 from datetime import timedelta
-import json
+import hashlib
+import logging
+import orjson
 import secrets
 
 from .models import AuthToken, UserProfile
 from history.models import DispatchJob
 
+logger = logging.getLogger(__name__)
+
+AUTH_CACHE_TTL = 5 * 60  # seconds a validated token is trusted without re-reading its row
+AUTH_TOKEN_BYTES = 24  # 192 bits of entropy -> 32 URL-safe characters
+
 # MARK: - Web Authentication (Session-based)
 
 def web_login(request):
@@ -24,19 +32,8 @@ def web_login(request):
         email_or_username = request.POST.get('email', '').lower().strip()
         password = request.POST.get('password', '')
 
-        # Try to find user by email first, then username
-        user = None
-        try:
-            user = User.objects.get(email=email_or_username)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(username=email_or_username)
-            except User.DoesNotExist:
-                messages.error(request, 'Invalid email/username or password')
-                return render(request, 'streaming/login.html')
-
-        # Authenticate
-        user = authenticate(request, username=user.username, password=password)
+        # EmailOrUsernameBackend resolves email or username in one query
+        user = authenticate(request, username=email_or_username, password=password)
 
         if user is not None:
             login(request, user)
@@ -64,25 +61,15 @@ def ios_login(request):
         return JsonResponse({'success': False, 'error': 'POST required'}, status=405)
     print("ios_login running....")
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         email_or_username = data.get('email', '').lower().strip()
         password = data.get('password', '')
         print(f"Attempting to log in >{email_or_username}< >{password}<... ")
         if not email_or_username or not password:
             return JsonResponse({'success': False, 'error': 'Email/username and password required'}, status=400)
 
-        # Find user by email first, then username
-        user = None
-        try:
-            user = User.objects.get(email=email_or_username)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(username=email_or_username)
-            except User.DoesNotExist:
-                return JsonResponse({'success': False, 'error': 'Invalid credentials'}, status=401)
-
-        # Authenticate
-        authenticated_user = authenticate(username=user.username, password=password)
+        # EmailOrUsernameBackend resolves email or username in one query
+        authenticated_user = authenticate(request, username=email_or_username, password=password)
 
         if authenticated_user is None:
             return JsonResponse({'success': False, 'error': 'Invalid credentials'}, status=401)
@@ -93,16 +80,7 @@ def ios_login(request):
         # Generate authentication token
         token = generate_auth_token(authenticated_user)
 
-        current_appointment = None
-        dispatch_jobs = DispatchJob.objects.filter(active=True, tech_id=str(profile.st_id))
-        if len(dispatch_jobs) > 0:
-            d_job = dispatch_jobs[0]
-            appointment_id = d_job.appointment_id
-            if d_job.polling_active and d_job.ai_document_built:
-                current_appointment = {
-                    "appointment_id": appointment_id,
-                    "result": 3
-                }
+        current_appointment = get_current_appointment(profile)
         print(f"current_appointment: {current_appointment}")
 
         return JsonResponse({
@@ -120,7 +98,7 @@ def ios_login(request):
             'current_appointment':current_appointment
         })
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -133,36 +111,35 @@ def ios_verify_token(request):
         return JsonResponse({'valid': False, 'error': 'POST required'}, status=405)
 
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         token_string = data.get('token', '')
 
         if not token_string:
             return JsonResponse({'valid': False, 'error': 'Token required'}, status=400)
 
         try:
-            token = AuthToken.objects.get(token=token_string, is_active=True)
-
-            # Check if token is expired
+            # `token` is unique (so indexed); load only the columns this view
+            # returns instead of every user/profile column.
+            token = AuthToken.objects.select_related('user__profile').only(
+                'expires_at', 'is_active',
+                'user__email', 'user__username', 'user__first_name',
+                'user__last_name', 'user__is_staff', 'user__profile__st_id',
+            ).get(token=token_string, is_active=True)
+
+            # Check if token is expired (the daily cleanup_expired run
+            # deactivates expired tokens in bulk, so no write here)
             if token.expires_at < timezone.now():
-                token.is_active = False
-                token.save()
                 return JsonResponse({'valid': False, 'error': 'Token expired'}, status=401)
 
             # Token is valid
             user = token.user
 
-            profile, _ = UserProfile.objects.get_or_create(user=user)
-
-            current_appointment = None
-            dispatch_jobs = DispatchJob.objects.filter(active=True, tech_id=str(profile.st_id))
-            if len(dispatch_jobs) > 0:
-                d_job = dispatch_jobs[0]
-                appointment_id = d_job.appointment_id
-                if d_job.polling_active and d_job.ai_document_built:
-                    current_appointment = {
-                        "appointment_id": appointment_id,
-                        "result": 3
-                    }
+            # Profile comes joined from the token lookup; create it only if missing
+            profile = getattr(user, 'profile', None)
+            if profile is None:
+                profile, _ = UserProfile.objects.get_or_create(user=user)
+
+            current_appointment = get_current_appointment(profile)
             print(f"current_appointment: {current_appointment}")
 
             return JsonResponse({
@@ -181,7 +158,7 @@ def ios_verify_token(request):
         except AuthToken.DoesNotExist:
             return JsonResponse({'valid': False, 'error': 'Invalid token'}, status=401)
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return JsonResponse({'valid': False, 'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         return JsonResponse({'valid': False, 'error': str(e)}, status=500)
@@ -194,20 +171,21 @@ def ios_logout(request):
         return JsonResponse({'success': False, 'error': 'POST required'}, status=405)
 
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         token_string = data.get('token', '')
 
         if token_string:
             try:
                 token = AuthToken.objects.get(token=token_string)
                 token.is_active = False
-                token.save()
+                token.save(update_fields=['is_active'])
+                invalidate_cached_token(token_string)
             except AuthToken.DoesNotExist:
                 pass
 
         return JsonResponse({'success': True})
 
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -215,13 +193,29 @@ def ios_logout(request):
 
 # MARK: - Helper Functions
 
+def get_current_appointment(profile):
+    """
+    Appointment iOS should resume on launch: the tech's active DispatchJob,
+    if its AI document is ready and ST polling is still running.
+    """
+    d_job = DispatchJob.objects.filter(active=True, tech_id=str(profile.st_id)).only(
+        'appointment_id', 'polling_active', 'ai_document_built'
+    ).first()
+    if d_job and d_job.polling_active and d_job.ai_document_built:
+        return {
+            "appointment_id": d_job.appointment_id,
+            "result": 3
+        }
+    return None
+
+
 def generate_auth_token(user):
     """Generate a new authentication token for a user"""
     # Deactivate old tokens (optional - or keep multiple active)
     # AuthToken.objects.filter(user=user, is_active=True).update(is_active=False)
 
     # Generate new token
-    token_string = secrets.token_urlsafe(48)
+    token_string = secrets.token_urlsafe(AUTH_TOKEN_BYTES)
     expires_at = timezone.now() + timedelta(days=30)  # 30-day token
 
     token = AuthToken.objects.create(
@@ -234,14 +228,58 @@ def generate_auth_token(user):
     return token
 
 
+def auth_cache_key(token_string):
+    """Cache key for a token's user; the raw token never ends up in Redis"""
+    digest = hashlib.blake2b(token_string.encode(), digest_size=16).hexdigest()
+    return f"authctx:{digest}"
+
+
+def invalidate_cached_token(token_string):
+    """Call whenever a token is deactivated so it stops authenticating immediately"""
+    try:
+        cache.delete(auth_cache_key(token_string))
+    except Exception:
+        logger.warning("Could not invalidate cached auth token", exc_info=True)
+
+
 def get_user_from_token(token_string):
-    """Helper to get user from token string"""
+    """
+    Helper to get user from token string
+
+    `token` is a unique (indexed) column, so this is a single index lookup;
+    the user and their profile are joined in so callers reading user.profile
+    don't pay extra queries. A validated token is cached as (user_id,
+    expires_at) for AUTH_CACHE_TTL (never past its expiry), so repeat calls
+    skip the token lookup; the user and profile are still read fresh, so
+    deactivating a user takes effect immediately. The cache is optional:
+    if it's unreachable the token is checked against the DB.
+    """
+    cache_key = auth_cache_key(token_string)
     try:
-        token = AuthToken.objects.get(token=token_string, is_active=True)
-        if token.expires_at < timezone.now():
-            token.is_active = False
-            token.save()
+        cached = cache.get(cache_key)
+    except Exception:
+        logger.warning("Auth token cache read failed", exc_info=True)
+        cached = None
+
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at <= timezone.now():
             return None
-        return token.user
+        return User.objects.select_related('profile').filter(pk=user_id, is_active=True).first()
+
+    try:
+        token = AuthToken.objects.select_related('user__profile').only(
+            'expires_at', 'is_active', 'user'
+        ).get(token=token_string, is_active=True, user__is_active=True)
     except AuthToken.DoesNotExist:
-        return None
\ No newline at end of file
+        return None
+
+    remaining = (token.expires_at - timezone.now()).total_seconds()
+    if remaining <= 0:
+        # Deactivated in bulk by the cleanup_expired command
+        return None
+    try:
+        cache.set(cache_key, (token.user_id, token.expires_at), min(AUTH_CACHE_TTL, int(remaining)))
+    except Exception:
+        logger.warning("Auth token cache write failed", exc_info=True)
+    return token.user
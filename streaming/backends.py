@@ -0,0 +1,37 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.db.models import Q
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """
+    Authenticate with either an email address or a username.
+
+    Both login views accept "email or username" in one field; resolving it
+    here takes one query instead of a lookup in the view followed by
+    ModelBackend fetching the same user again. An email match wins over a
+    username match, as the views always did.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        candidates = list(
+            User.objects.filter(Q(email=username) | Q(username=username)).order_by('pk')
+        )
+        user = next((u for u in candidates if u.email == username), None)
+        if user is None:
+            user = next((u for u in candidates if u.username == username), None)
+
+        if user is None:
+            # Run the hasher anyway so response time doesn't reveal whether
+            # the account exists (same as ModelBackend).
+            User().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
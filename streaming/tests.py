@@ -1,3 +1,123 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from streaming.auth_views import get_user_from_token, invalidate_cached_token
+from streaming.models import AuthToken, UserProfile
+
+
+class GetUserFromTokenTests(TestCase):
+    """Token lookups are cached so the iOS app's repeated calls skip the token query."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="tech", password="pw")
+        UserProfile.objects.create(user=self.user, st_id="3027961")
+        self.token = AuthToken.objects.create(
+            user=self.user,
+            token="t" * 64,
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_second_lookup_skips_the_token_query(self):
+        self.assertEqual(get_user_from_token(self.token.token), self.user)
+
+        # Only the user + profile are re-read; the token row comes from cache
+        with self.assertNumQueries(1):
+            user = get_user_from_token(self.token.token)
+            self.assertEqual(user.profile.st_id, "3027961")
+
+    def test_deactivated_user_is_rejected_while_token_is_cached(self):
+        get_user_from_token(self.token.token)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertIsNone(get_user_from_token(self.token.token))
+
+    def test_profile_changes_are_seen_while_token_is_cached(self):
+        get_user_from_token(self.token.token)
+        UserProfile.objects.filter(user=self.user).update(st_id="4000000")
+
+        self.assertEqual(get_user_from_token(self.token.token).profile.st_id, "4000000")
+
+    @patch("streaming.auth_views.cache")
+    def test_cache_outage_falls_back_to_db(self, mock_cache):
+        mock_cache.get.side_effect = ConnectionError("redis down")
+        mock_cache.set.side_effect = ConnectionError("redis down")
+
+        self.assertEqual(get_user_from_token(self.token.token), self.user)
+
+    def test_invalidated_token_hits_db_again(self):
+        get_user_from_token(self.token.token)
+        AuthToken.objects.filter(pk=self.token.pk).update(is_active=False)
+        invalidate_cached_token(self.token.token)
+
+        self.assertIsNone(get_user_from_token(self.token.token))
+
+    def test_expired_token_is_rejected_without_a_write(self):
+        AuthToken.objects.filter(pk=self.token.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        # One SELECT; expired tokens are deactivated in bulk by cleanup_expired
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_user_from_token(self.token.token))
+        self.assertIsNone(get_user_from_token(self.token.token))
+
+    def test_cleanup_expired_deactivates_expired_tokens(self):
+        expired = AuthToken.objects.create(
+            user=self.user,
+            token="e" * 64,
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+
+        with patch("chunking.management.commands.cleanup_expired.get_s3_client"):
+            call_command("cleanup_expired", stdout=StringIO())
+
+        expired.refresh_from_db()
+        self.token.refresh_from_db()
+        self.assertFalse(expired.is_active)
+        self.assertTrue(self.token.is_active)
+
+
+class EmailOrUsernameBackendTests(TestCase):
+    """Login resolves email or username in a single user lookup."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="tech", email="tech@example.com", password="pw"
+        )
+
+    def test_authenticates_by_email(self):
+        self.assertEqual(authenticate(username="tech@example.com", password="pw"), self.user)
+
+    def test_authenticates_by_username(self):
+        self.assertEqual(authenticate(username="tech", password="pw"), self.user)
+
+    def test_wrong_password_is_rejected(self):
+        self.assertIsNone(authenticate(username="tech@example.com", password="nope"))
+
+    def test_unknown_user_is_rejected(self):
+        self.assertIsNone(authenticate(username="nobody@example.com", password="pw"))
+
+    def test_email_match_wins_over_username_match(self):
+        other = User.objects.create_user(
+            username="pat@example.com", email="pat.other@example.com", password="other"
+        )
+        User.objects.create_user(username="pat", email="pat@example.com", password="pw")
+
+        user = authenticate(username="pat@example.com", password="pw")
+
+        self.assertIsNotNone(user)
+        self.assertNotEqual(user, other)
 
-# Create your tests here.
+    def test_lookup_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            authenticate(username="tech@example.com", password="pw")
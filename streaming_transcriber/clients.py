@@ -0,0 +1,46 @@
+"""
+Process-wide API clients shared by the chunking and history apps.
+
+Kept apart from the apps' own modules so that getting a client doesn't
+import (and configure) everything else those modules pull in.
+"""
+
+import boto3
+from django.conf import settings
+from functools import lru_cache
+from openai import OpenAI
+
+
+@lru_cache(maxsize=1)
+def get_openai_client():
+    """
+    Lazily initialize and cache the OpenAI client.
+    Ensures it's created once per process and reused safely.
+
+    max_retries=3 is the SDK's built-in retry-with-backoff for transient
+    failures (network errors, 5xx responses) — without it, a single blip
+    during transcription stamps transcription_error and ends the run.
+    """
+    api_key = getattr(settings, "OPENAI_API_KEY", None)
+    if not api_key:
+        print("⚠️ OpenAI API key not found - AI analysis will be skipped")
+        return None
+    print("✅ OpenAI client initialized (cached)")
+    return OpenAI(api_key=api_key, max_retries=3)
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """
+    Get configured S3 client.
+
+    Cached per process: boto3 clients are thread-safe, and reusing one keeps
+    its connection pool warm instead of paying a fresh TLS handshake on
+    every call.
+    """
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION_NAME
+    )
@@ -212,6 +212,19 @@ else:
     }
 
 # Redis/Django Q configuration
+
+# AssemblyAI/OpenAI jobs (chunking.tasks) run for minutes, so they get their
+# own cluster and workers instead of sharing the default cluster with pollA
+# and push notifications. Started by the Procfile `transcriber` process
+# (Q_CLUSTER_NAME=transcription); timeout/retry cover the longest task.
+TRANSCRIPTION_ALT_CLUSTERS = {
+    'transcription': {
+        'workers': 2,
+        'timeout': 30 * 60,
+        'retry': 31 * 60,
+    },
+}
+
 if PRODUCTION:
     # Production: Use Heroku Redis URL with SSL
     import urllib.parse as urlparse
@@ -236,6 +249,7 @@ if PRODUCTION:
             'ssl_cert_reqs': None,  # Don't verify SSL certificates
         },
         'catch_up': False,
+        'ALT_CLUSTERS': TRANSCRIPTION_ALT_CLUSTERS,
     }
 else:
     # Local development
@@ -255,8 +269,37 @@ else:
             'db': 0,
         },
         'catch_up': False,
+        'ALT_CLUSTERS': TRANSCRIPTION_ALT_CLUSTERS,
     }
 
+# Shared cache (same Redis as Django Q) so the web dyno and the qcluster
+# worker see the same entries — e.g. AI job documents the worker caches as
+# soon as they're built. Locally (and under tests) a per-process LocMemCache
+# is enough: entries just aren't shared with the worker, which only costs
+# cache misses. Callers treat the cache as optional either way.
+if PRODUCTION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', ''),
+            'KEY_PREFIX': 'cache',
+            'OPTIONS': {
+                'ssl_cert_reqs': None,  # Heroku Redis uses self-signed certs
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Login accepts an email address or a username in the same field
+AUTHENTICATION_BACKENDS = [
+    'streaming.backends.EmailOrUsernameBackend',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 